@@ -0,0 +1,255 @@
+"""
+Columnar archive of pruned events.
+
+With `EVENTS_ARCHIVE_DIR` set, `/events/prune_old` streams each expiring
+month out of Postgres through a server-side cursor into a zstd-compressed
+Parquet file before its partition is dropped:
+
+    $EVENTS_ARCHIVE_DIR/event_month=2026-07/events_2026_07-0000001530-0000001541.parquet
+
+Rows are written in date order, one row group per fetched batch, so the
+min/max statistics of `event_date` let a scan skip row groups outside the
+requested range, and whole `event_month=` directories are skipped without
+being opened. `GET /archive/events` reads it back for trend analysis.
+
+pyarrow is optional and only imported once archiving is used; without it
+a prune that should archive refuses to drop anything.
+"""
+from __future__ import annotations
+
+import glob
+import os
+from datetime import date
+from typing import List, Optional
+
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from event_json import encode_events
+from events_api import EventOut, _validate_iso_date, verify_read_key
+
+ARCHIVE_DIR: Optional[str] = os.getenv("EVENTS_ARCHIVE_DIR") or None
+ARCHIVE_BATCH_ROWS = int(os.getenv("EVENTS_ARCHIVE_BATCH_ROWS", "10000"))
+ARCHIVE_COMPRESSION = "zstd"
+
+_MONTH_DIR_PREFIX = "event_month="
+
+_SELECT_SQL = """
+    SELECT id, title, datetime, event_date, venue, venue_id, location, latlong,
+        geo[0] AS lon, geo[1] AS lat, geohash, url, description, categories,
+        source, sources, source_categories, created_at, updated_at
+    FROM {partition}
+    ORDER BY event_date, datetime, id
+"""
+
+# Columns returned by /archive/events, in EventOut order.
+_EVENT_COLUMNS = [
+    "id", "title", "datetime", "venue", "venue_id", "location", "latlong",
+    "url", "description", "categories", "source", "sources",
+]
+
+# Imported on first use, like NumPy in hot_window.
+pa = pc = ds = pq = None
+
+
+def _import_pyarrow() -> bool:
+    global pa, pc, ds, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.compute
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pa, pc, ds, pq = pyarrow, pyarrow.compute, pyarrow.dataset, pyarrow.parquet
+    return True
+
+
+def enabled() -> bool:
+    return ARCHIVE_DIR is not None
+
+
+def available() -> bool:
+    """Archiving is configured and pyarrow can be imported."""
+    return enabled() and _import_pyarrow()
+
+
+def _schema():
+    strings = pa.list_(pa.string())
+    return pa.schema(
+        [
+            ("id", pa.int32()),
+            ("title", pa.string()),
+            ("datetime", pa.string()),
+            ("event_date", pa.date32()),
+            ("venue", pa.string()),
+            ("venue_id", pa.int32()),
+            ("location", pa.string()),
+            ("latlong", pa.string()),
+            ("lon", pa.float64()),
+            ("lat", pa.float64()),
+            ("geohash", pa.string()),
+            ("url", pa.string()),
+            ("description", pa.string()),
+            ("categories", strings),
+            ("source", pa.string()),
+            ("sources", strings),
+            ("source_categories", strings),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+            ("updated_at", pa.timestamp("us", tz="UTC")),
+        ]
+    )
+
+
+def _fsync(path: str) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+async def archive_partition(conn: asyncpg.Connection, partition: str, month: date) -> Optional[str]:
+    """
+    Write every row of `partition` to one Parquet file and return its path
+    (None if the partition is empty). Runs inside the transaction that then
+    drops the partition, so the file is complete and synced before any row
+    is gone. The name carries the id range, so a retried prune overwrites
+    its own earlier attempt instead of duplicating it.
+    """
+    schema = _schema()
+    directory = os.path.join(ARCHIVE_DIR, f"{_MONTH_DIR_PREFIX}{month:%Y-%m}")
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{partition}.parquet.tmp")
+
+    writer = None
+    min_id = max_id = None
+    try:
+        # A named cursor, so it can be closed before the partition is dropped.
+        await conn.execute(
+            f"DECLARE archive_rows NO SCROLL CURSOR FOR {_SELECT_SQL.format(partition=partition)}"
+        )
+        while True:
+            rows = await conn.fetch(f"FETCH {ARCHIVE_BATCH_ROWS} FROM archive_rows")
+            if not rows:
+                break
+            batch = pa.record_batch(
+                [pa.array([row[field.name] for row in rows], type=field.type) for field in schema],
+                schema=schema,
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, schema, compression=ARCHIVE_COMPRESSION)
+            writer.write_batch(batch)
+            ids = batch.column("id")
+            low, high = pc.min(ids).as_py(), pc.max(ids).as_py()
+            min_id = low if min_id is None else min(min_id, low)
+            max_id = high if max_id is None else max(max_id, high)
+        await conn.execute("CLOSE archive_rows")
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        raise
+    if writer is None:
+        return None
+    writer.close()
+    _fsync(tmp_path)
+    path = os.path.join(directory, f"{partition}-{min_id:010d}-{max_id:010d}.parquet")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _contains(lists, value: str):
+    """Row mask for list<string> rows that contain `value`."""
+    parents = pc.list_parent_indices(lists).filter(pc.equal(pc.list_flatten(lists), value))
+    return pc.is_in(
+        pa.array(range(len(lists)), type=pa.int64()), value_set=parents.cast(pa.int64())
+    )
+
+
+def _archive_files(start: Optional[date], end: Optional[date]) -> List[str]:
+    """Parquet files of the months overlapping [start, end], oldest first."""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    files = []
+    for entry in sorted(os.listdir(ARCHIVE_DIR)):
+        if not entry.startswith(_MONTH_DIR_PREFIX):
+            continue
+        month = entry[len(_MONTH_DIR_PREFIX) :]
+        if (start and month < f"{start:%Y-%m}") or (end and month > f"{end:%Y-%m}"):
+            continue
+        files.extend(sorted(glob.glob(os.path.join(ARCHIVE_DIR, entry, "*.parquet"))))
+    return files
+
+
+def scan(
+    start: Optional[date],
+    end: Optional[date],
+    source: Optional[str],
+    category: Optional[str],
+    limit: int,
+    offset: int,
+) -> List[dict]:
+    """
+    Archived events matching the filters, in date order. The date range is
+    pushed down to the month directories and the row-group statistics;
+    source and category are list columns, so they are filtered per batch
+    with vectorized membership masks. Stops reading once `limit` is met.
+    """
+    predicate = None
+    for condition in (
+        ds.field("event_date") >= start if start else None,
+        ds.field("event_date") <= end if end else None,
+    ):
+        if condition is not None:
+            predicate = condition if predicate is None else predicate & condition
+
+    events: List[dict] = []
+    to_skip = offset
+    for path in _archive_files(start, end):
+        scanner = ds.dataset(path, format="parquet").scanner(
+            columns=_EVENT_COLUMNS, filter=predicate, batch_size=ARCHIVE_BATCH_ROWS
+        )
+        for batch in scanner.to_batches():
+            if source is not None:
+                batch = batch.filter(_contains(batch.column("sources"), source))
+            if category is not None:
+                batch = batch.filter(_contains(batch.column("categories"), category))
+            if to_skip >= batch.num_rows:
+                to_skip -= batch.num_rows
+                continue
+            batch = batch.slice(to_skip, limit - len(events))
+            to_skip = 0
+            events.extend(batch.to_pylist())
+            if len(events) >= limit:
+                return events
+    return events
+
+
+router = APIRouter(tags=["archive"])
+
+
+# A plain `def`: Parquet reads block, so FastAPI runs it in its threadpool.
+@router.get(
+    "/archive/events",
+    response_model=List[EventOut],
+    dependencies=[Depends(verify_read_key)],
+)
+def list_archived_events(
+    start_date: Optional[str] = Query(default=None, description="Filter start (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(default=None, description="Filter end (YYYY-MM-DD)"),
+    source: Optional[str] = Query(default=None, description="Filter by source (any source that listed the event)"),
+    category: Optional[str] = Query(
+        default=None, description="Filter by category (exact match within categories[])"
+    ),
+    limit: int = Query(default=1000, ge=1, le=10000, description="Max events to return"),
+    offset: int = Query(default=0, ge=0, description="Pagination offset"),
+):
+    """Pruned events from the Parquet archive, oldest first."""
+    if not enabled():
+        raise HTTPException(status_code=404, detail="Event archive is not configured")
+    if not _import_pyarrow():
+        raise HTTPException(status_code=503, detail="Event archive needs pyarrow installed")
+    start = date.fromisoformat(_validate_iso_date(start_date, "start_date")) if start_date else None
+    end = date.fromisoformat(_validate_iso_date(end_date, "end_date")) if end_date else None
+    rows = scan(start, end, source, category, limit, offset)
+    # Encoded like /events (`name`, `date` and `category` included).
+    return Response(content=encode_events(rows), media_type="application/json")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Throughput of the rule-based category classifier.
+
+Compares a naive scan (one regex search per keyword per event), the
+single-event `determine_categories`, and the batch `classify_events` that
+ingest uses, on synthetic scraped events. No database is needed.
+
+    python benchmarks/bench_categories.py [--events 5000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from data_from_apis.categories import (
+    CATEGORY_KEYWORDS,
+    classify_events,
+    determine_categories,
+)
+
+_TITLE_WORDS = (
+    "Live", "Night", "Tour", "Comedy", "Jazz", "Festival", "Yoga", "Giants",
+    "Dodgers", "Film", "Screening", "Party", "Gallery", "Opening", "Open Mic",
+    "Run", "Market", "Drag", "Brunch", "Workshop", "Orchestra", "Stand-Up",
+)
+_VENUES = (
+    "The Warfield", "Cobb's Comedy Club", "Golden Gate Park", "Oracle Park",
+    "SFMOMA", "The Independent", "Rickshaw Stop", "Dolores Park", "The Chapel",
+)
+_FILLER = (
+    "join us for an evening of fun with friends and neighbors in the heart of "
+    "the city, doors open early and tickets are limited so arrive on time "
+)
+
+
+def _fake_events(count: int) -> List[dict]:
+    rng = random.Random(7)
+    return [
+        {
+            "title": " ".join(rng.sample(_TITLE_WORDS, 3)),
+            "description": _FILLER * rng.randint(1, 6),
+            "venue": rng.choice(_VENUES),
+            "categories": rng.choice([None, [], ["Music"], ["Arts & Theatre"]]),
+        }
+        for _ in range(count)
+    ]
+
+
+def _naive(events: List[dict]) -> List[List[str]]:
+    patterns = {
+        category: [re.compile(rf"\b{re.escape(k)}", re.IGNORECASE) for k in keywords]
+        for category, keywords in CATEGORY_KEYWORDS.items()
+    }
+    out = []
+    for event in events:
+        text = " ".join(
+            str(v) for v in (event["title"], event["description"], event["venue"]) if v
+        )
+        out.append(
+            [c for c, regexes in patterns.items() if any(r.search(text) for r in regexes)]
+        )
+    return out
+
+
+def _per_event(events: List[dict]) -> List[List[str]]:
+    return [
+        determine_categories(e["title"], e["description"], e["venue"], e["categories"])
+        for e in events
+    ]
+
+
+def _events_per_second(fn, events: List[dict], repeat: int) -> float:
+    fn(events[:100])  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(events)
+    return len(events) * repeat / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    events = _fake_events(args.events)
+    naive = _events_per_second(_naive, events, args.repeat)
+    single = _events_per_second(_per_event, events, args.repeat)
+    batch = _events_per_second(classify_events, events, args.repeat)
+
+    print(f"{args.events} events, {args.repeat} repeats")
+    print(f"  naive (regex per keyword):   {naive:10.0f} events/s")
+    print(f"  determine_categories:        {single:10.0f} events/s")
+    print(f"  classify_events (batch):     {batch:10.0f} events/s")
+    print(f"  batch vs naive:              {batch / naive:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
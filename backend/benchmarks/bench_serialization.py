@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Per-row serialization cost of a 1000-event /events page.
+
+Compares the old path (build a dict per row, validate it against
+List[EventOut], dump and json.dumps it the way FastAPI's response_model
+does) with event_json.encode_events. No database is needed.
+
+    python benchmarks/bench_serialization.py [--rows 1000] [--repeat 50]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pydantic import TypeAdapter
+
+from event_json import encode_events, event_row_to_dict
+
+
+def _fake_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": i,
+            "title": f"Live at the Warfield #{i}",
+            "datetime": f"2026-03-{(i % 28) + 1:02d}T20:00-0800",
+            "venue": "The Warfield",
+            "location": "982 Market St, San Francisco, CA",
+            "latlong": "37.7826,-122.4100",
+            "url": f"https://example.com/events/{i}",
+            "description": "An evening of live music. " * 16,
+            "categories": ["music", "nightlife"],
+            "source": "ticketmaster",
+        }
+        for i in range(count)
+    ]
+
+
+def _response_model_path(adapter: TypeAdapter, rows: List[dict]) -> bytes:
+    payload = [event_row_to_dict(r) for r in rows]
+    validated = adapter.validate_python(payload)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def _time_per_row(fn, rows: List[dict], repeat: int) -> float:
+    fn(rows)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(rows)
+    return (time.perf_counter() - start) / repeat / len(rows) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    # EventOut is defined in events_api, which reads the API keys on import.
+    os.environ.setdefault("SCRAPER_API_KEY", "benchmark")
+    os.environ.setdefault("READ_API_KEY", "benchmark")
+    from events_api import EventOut
+
+    adapter = TypeAdapter(List[EventOut])
+    rows = _fake_rows(args.rows)
+
+    before = _time_per_row(lambda r: _response_model_path(adapter, r), rows, args.repeat)
+    after = _time_per_row(encode_events, rows, args.repeat)
+
+    print(f"{args.rows} rows, {args.repeat} repeats")
+    print(f"  response_model + json.dumps: {before:8.2f} µs/row")
+    print(f"  encode_events (orjson):      {after:8.2f} µs/row")
+    print(f"  speedup:                     {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Cold-start cost of the two ASGI entry points, `main:app` (full) and
+`main_read:app` (read-only).
+
+Each run is a fresh interpreter that imports the entry point and then, if
+DATABASE_URL is set, runs the startup hooks and serves one
+`GET /events?limit=1` in process. Reports the median import time, the time
+from interpreter start to the first response, and how many modules were
+loaded.
+
+    python benchmarks/bench_startup.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+_CHILD = """
+import json, os, sys, time
+started = time.perf_counter()
+import {module} as entry
+imported = time.perf_counter()
+result = {{"import_ms": (imported - started) * 1000, "modules": len(sys.modules)}}
+if os.getenv("DATABASE_URL"):
+    from fastapi.testclient import TestClient
+    with TestClient(entry.app) as client:
+        response = client.get("/events", params={{"limit": 1}},
+                              headers={{"X-API-Key": os.environ["READ_API_KEY"]}})
+        response.raise_for_status()
+        result["first_request_ms"] = (time.perf_counter() - started) * 1000
+print(json.dumps(result))
+"""
+
+
+def _run_once(module: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(module=module)],
+        cwd=BACKEND_DIR,
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    # Startup hooks print progress; the result is the last line.
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SCRAPER_API_KEY", "benchmark")
+    os.environ.setdefault("READ_API_KEY", "benchmark")
+    if not os.getenv("DATABASE_URL"):
+        print("DATABASE_URL not set: measuring imports only")
+
+    print(f"median of {args.repeat} cold starts")
+    for module in ("main", "main_read"):
+        runs = [_run_once(module) for _ in range(args.repeat)]
+        line = (
+            f"  {module + ':app':<14} import {statistics.median(r['import_ms'] for r in runs):7.1f} ms"
+            f"  modules {runs[0]['modules']:5d}"
+        )
+        if "first_request_ms" in runs[0]:
+            first = statistics.median(r["first_request_ms"] for r in runs)
+            line += f"  first request {first:7.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Content-Encoding negotiation for JSON responses.
+
+Bodies are compressed once and cached next to the identity bytes, so a
+repeat request for a large list costs a dictionary lookup rather than a
+fresh brotli/gzip pass.
+"""
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import AsyncIterator, Optional
+
+import brotli
+
+# Below this size the headers outweigh the savings.
+MIN_COMPRESS_BYTES = 1024
+
+_PREFERENCE = ("br", "gzip")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported encoding the client accepts (q > 0), or None for identity."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    for encoding in _PREFERENCE:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+async def compress_stream(
+    chunks: AsyncIterator[bytes], encoding: str
+) -> AsyncIterator[bytes]:
+    """Compress a streamed body incrementally, one chunk at a time."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        async for chunk in chunks:
+            out = compressor.process(chunk)
+            if out:
+                yield out
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    async for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
@@ -1,15 +1,160 @@
+"""
+Rule-based event categories.
+
+`CATEGORY_KEYWORDS` maps each category the frontend filters on to the
+words that imply it. All keywords are compiled into one prefix-factored
+regular expression, and `classify_events` runs it once over a whole ingest batch
+(titles, descriptions, venues and the labels the source supplied, joined
+with separators). Each match is mapped back to its event by offset, so
+a batch costs one pass of the regex engine instead of one per event and
+per category.
+"""
 import re
-import requests
-import logging 
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Sequence
+
+# Category -> keywords (lowercase; a trailing "s"/"es" also matches).
+# Words that are common outside their category ("rock" climbing, board
+# "game", bartending "class") only count as part of a longer phrase.
+CATEGORY_KEYWORDS = {
+    "music": (
+        "music", "concert", "live music", "band", "dj", "orchestra", "symphony",
+        "opera", "jazz", "blues", "rock concert", "rock band", "rock show",
+        "rock and roll", "rock 'n' roll", "indie rock", "punk rock", "classic rock",
+        "hip hop", "hip-hop", "rap", "punk",
+        "metal", "indie", "folk", "country", "soul", "funk", "reggae", "techno",
+        "house music", "edm", "electronic", "singer", "songwriter", "choir",
+        "acoustic", "album release", "karaoke", "recital",
+        # Music venues, for scrapers whose listings are only a name.
+        "warfield", "fillmore", "the independent", "great american music hall",
+        "bottom of the hill", "the chapel", "rickshaw stop", "bimbo's",
+        "august hall", "the masonic", "regency ballroom", "cafe du nord", "café du nord",
+        "bill graham civic", "sfjazz", "davies symphony hall", "the midway",
+    ),
+    "comedy": (
+        "comedy", "comedy club", "comedian", "stand-up", "standup", "stand up",
+        "improv", "sketch", "open mic", "roast", "punch line", "cobb's", "cobbs",
+        "laugh", "funny",
+    ),
+    "sports": (
+        "sports", "game day", "gameday", "home game", "giants", "warriors", "49ers", "valkyries",
+        "earthquakes", "basketball", "baseball", "football", "soccer", "hockey",
+        "tennis", "golf", "boxing", "wrestling", "mma", "rugby", "volleyball",
+        "tournament", "playoff", "championship", "oracle park",
+        "chase center", "kezar",
+    ),
+    "festival": (
+        "festival", "fest", "fair", "street fair", "carnival", "parade",
+        "block party", "celebration", "pride", "outside lands", "hardly strictly",
+        "fiesta", "night market", "flea market",
+    ),
+    "culture": (
+        "art", "arts", "arts & theatre", "theatre", "theater", "museum", "gallery",
+        "exhibit", "exhibition", "film", "cinema", "screening", "movie", "ballet",
+        "dance performance", "play", "musical", "broadway", "poetry",
+        "author", "book reading", "lecture", "history", "literary", "workshop",
+        "art class", "painting class", "drawing class", "pottery class",
+        "ceramics class", "writing class", "craft", "culture", "cultural",
+    ),
+    "active": (
+        "fun run", "run club", "5k", "10k", "marathon", "walk", "hike", "hiking",
+        "bike", "cycling", "ride", "yoga", "fitness", "workout", "pilates", "swim",
+        "climb", "climbing", "kayak", "paddle", "skate", "bootcamp", "zumba",
+        "dance class", "outdoor", "rec and park", "recreation", "tai chi",
+    ),
+    "nightlife": (
+        "nightlife", "club", "nightclub", "party", "parties", "dance party", "rave",
+        "dj set", "after hours", "afterhours", "bar", "lounge", "happy hour",
+        "late night", "drag", "burlesque", "cocktail",
+    ),
+}
+
+# Keyword -> categories; a keyword may imply more than one.
+_CATEGORIES_FOR_KEYWORD: dict = {}
+for _category, _keywords in CATEGORY_KEYWORDS.items():
+    for _keyword in _keywords:
+        _CATEGORIES_FOR_KEYWORD.setdefault(_keyword, []).append(_category)
+
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    One alternation with shared prefixes factored out ("comed(?:y|ian)"),
+    so the engine tests each character once instead of once per keyword.
+    Optional tails are greedy: "live music" wins over "live" at the same
+    position.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return emit(trie)
+
+
+_KEYWORD_RE = re.compile(
+    r"(?<!\w)(" + _trie_pattern(_CATEGORIES_FOR_KEYWORD) + r")(?:e?s)?(?!\w)"
+)
+
+_CATEGORY_ORDER = {category: i for i, category in enumerate(CATEGORY_KEYWORDS)}
+
+# Cannot appear in scraped text, so a match never spans two events.
+_SEPARATOR = "\x00"
+
+
+def _event_text(
+    title: Optional[str],
+    description: Optional[str],
+    venue: Optional[str],
+    categories: Optional[Sequence[Optional[str]]],
+) -> str:
+    parts = [title, description, venue, *(categories or ())]
+    return " \n ".join(p for p in parts if p).lower().replace(_SEPARATOR, " ")
+
 
+def classify_texts(texts: Sequence[str]) -> List[List[str]]:
+    """Categories for each pre-lowercased text, in `CATEGORY_KEYWORDS` order."""
+    blob = _SEPARATOR.join(texts)
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
 
-def determine_categories(title, description, venue, categories):
-    text = f"{title} {description} {venue}".lower()
-    #print(f"Determining categories with text: '{text}'")
-    
+    found: List[set] = [set() for _ in texts]
+    for match in _KEYWORD_RE.finditer(blob):
+        found[bisect_right(starts, match.start()) - 1].update(
+            _CATEGORIES_FOR_KEYWORD[match.group(1)]
+        )
+    return [sorted(categories, key=_CATEGORY_ORDER.__getitem__) for categories in found]
 
-    
 
+def classify_events(events: Iterable[dict]) -> List[List[str]]:
+    """Categories for each scraped event dict, from one regex pass over the batch."""
+    return classify_texts(
+        [
+            _event_text(
+                event.get("title"),
+                event.get("description"),
+                event.get("venue"),
+                event.get("categories"),
+            )
+            for event in events
+        ]
+    )
 
-    return categories
 
+def determine_categories(title, description, venue, categories) -> List[str]:
+    """Single-event form of `classify_events`; always returns a list."""
+    return classify_texts([_event_text(title, description, venue, categories)])[0]
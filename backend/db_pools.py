@@ -0,0 +1,101 @@
+"""
+Named connection pools, so one kind of traffic cannot starve another.
+
+- `read`: public list/detail queries. Points at `DATABASE_URL_READ` when set
+  (e.g. a streaming replica), otherwise at the primary.
+- `write`: ingest, prune, snapshots and other primary work.
+- `auth`: signed-in user traffic (accounts, sessions, itineraries), which
+  must see its own writes and so always uses the primary.
+
+Each pool's size comes from `DB_POOL_<NAME>_MIN` / `DB_POOL_<NAME>_MAX`.
+Before `open_pools` runs (CLI scripts, tests) `connection` falls back to a
+one-off connection to the same server.
+"""
+from __future__ import annotations
+
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import asyncpg
+
+POOL_NAMES = ("read", "write", "auth")
+
+_DEFAULT_MAX_SIZE = {"read": 10, "write": 4, "auth": 4}
+
+_pools: dict[str, asyncpg.Pool] = {}
+_dsns: dict[str, str] = {}
+_connect_kwargs: dict[str, dict] = {}
+
+
+def connect_kwargs_for(url: str) -> dict:
+    """Add SSL for Neon/remote connections, skip for local."""
+    if "neon.tech" in url or "sslmode=require" in url:
+        return {"ssl": "require"}
+    return {}
+
+
+def _pool_size(name: str) -> tuple[int, int]:
+    prefix = f"DB_POOL_{name.upper()}"
+    min_size = int(os.getenv(f"{prefix}_MIN", "1"))
+    max_size = int(os.getenv(f"{prefix}_MAX", str(_DEFAULT_MAX_SIZE[name])))
+    return min_size, max(max_size, min_size)
+
+
+def configure(dsn: str, read_dsn: Optional[str]) -> None:
+    """Record where each pool connects; `read_dsn` defaults to the primary."""
+    _dsns.update(read=read_dsn or dsn, write=dsn, auth=dsn)
+    for name, url in _dsns.items():
+        _connect_kwargs[name] = connect_kwargs_for(url)
+
+
+def has_replica() -> bool:
+    return _dsns.get("read") != _dsns.get("write")
+
+
+async def open_pools(**pool_kwargs) -> None:
+    for name in POOL_NAMES:
+        if name in _pools:
+            continue
+        min_size, max_size = _pool_size(name)
+        _pools[name] = await asyncpg.create_pool(
+            _dsns[name],
+            min_size=min_size,
+            max_size=max_size,
+            **pool_kwargs,
+            **_connect_kwargs[name],
+        )
+
+
+async def close_pools() -> None:
+    while _pools:
+        _, pool = _pools.popitem()
+        await pool.close()
+
+
+@asynccontextmanager
+async def connection(name: str) -> AsyncIterator[asyncpg.Connection]:
+    if name not in POOL_NAMES:
+        raise ValueError(f"Unknown pool: {name}")
+    pool = _pools.get(name)
+    if pool is not None:
+        async with pool.acquire() as conn:
+            yield conn
+        return
+
+    conn = await asyncpg.connect(_dsns[name], **_connect_kwargs[name])
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+def stats() -> dict:
+    return {
+        name: {
+            "size": pool.get_size(),
+            "idle": pool.get_idle_size(),
+            "max": pool.get_max_size(),
+        }
+        for name, pool in _pools.items()
+    }
@@ -0,0 +1,220 @@
+"""
+Ingest-time matching of the same real-world event across sources.
+
+The unique index on (title, datetime, venue) only catches exact repeats;
+Ticketmaster, DoTheBay and Resident Advisor describe the same show with
+different title punctuation, venue spellings ("The Warfield" vs "The
+Warfield, San Francisco, CA") and datetime formats (UTC, or local time
+with an offset; both are compared in local time via `event_time`).
+`DedupeIndex` blocks candidates by local calendar day plus a venue token
+or a ~1 km geohash cell, then compares titles by trigram similarity (the
+measure pg_trgm uses). Blocks are a handful of rows, so exact trigram sets
+are cheaper than MinHash signatures and never miss a pair.
+
+A source never lists the same event twice in one scrape, so two listings
+from one source in the same batch are never merged: one scraper's separate
+sessions ("Guided Tour: Modern Art" and "Guided Tour: Asian Art") stay
+separate rows. A listing that matches a stored row from an earlier scrape
+is that row re-scraped, whether or not the row already has its source,
+and the row the source listed before wins over other matches.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, List, Optional
+
+import asyncpg
+
+from event_time import local_date, local_start_minutes
+
+# Title trigram Jaccard at or above which two same-day events in one block
+# are treated as the same event.
+TITLE_SIMILARITY_THRESHOLD = 0.5
+
+# geohash prefix length for the location block (~1.2 km x 0.6 km cells).
+GEOCELL_PRECISION = 6
+
+_STOPWORDS = {"the", "a", "an", "at", "and", "of", "in", "live", "presents", "sf"}
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+
+
+def fold_text(text: str) -> str:
+    """Lowercase, strip accents and turn punctuation into spaces."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub(" ", text.lower())
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(w for w in fold_text(title).split() if w not in _STOPWORDS)
+
+
+def venue_token(venue: Optional[str]) -> Optional[str]:
+    """First significant word of the venue name, ignoring any address after a comma."""
+    if not venue:
+        return None
+    words = [w for w in fold_text(venue.split(",")[0]).split() if w not in _STOPWORDS]
+    return words[0] if words else None
+
+
+def trigrams(text: str) -> frozenset:
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class Candidate:
+    id: Optional[int]
+    day: str
+    start_minutes: Optional[int]
+    title: str
+    grams: frozenset
+    venue_token: Optional[str]
+    geocell: Optional[str]
+    sources: frozenset = frozenset()
+    # Sources that listed this event in the current ingest batch.
+    batch_sources: frozenset = frozenset()
+
+    def block_keys(self) -> List[tuple]:
+        keys = []
+        if self.venue_token:
+            keys.append((self.day, "venue", self.venue_token))
+        if self.geocell:
+            keys.append((self.day, "cell", self.geocell))
+        return keys
+
+
+def make_candidate(
+    event_id: Optional[int],
+    title: Optional[str],
+    datetime_value: Optional[str],
+    venue: Optional[str],
+    geohash: Optional[str],
+    sources: Iterable[str] = (),
+    in_batch: bool = True,
+) -> Optional[Candidate]:
+    """
+    None when the event lacks the title or date every block key needs.
+    `in_batch` is False for rows stored by an earlier ingest.
+    """
+    day = local_date(datetime_value)
+    if not title or day is None:
+        return None
+    normalized = normalize_title(title)
+    sources = frozenset(s for s in sources if s)
+    return Candidate(
+        id=event_id,
+        day=day.isoformat(),
+        start_minutes=local_start_minutes(datetime_value),
+        title=normalized,
+        grams=trigrams(normalized),
+        venue_token=venue_token(venue),
+        geocell=geohash[:GEOCELL_PRECISION] if geohash else None,
+        sources=sources,
+        batch_sources=sources if in_batch else frozenset(),
+    )
+
+
+def is_match(a: Candidate, b: Candidate) -> bool:
+    if a.day != b.day:
+        return False
+    # A source never lists the same event twice in one scrape.
+    if a.batch_sources & b.batch_sources:
+        return False
+    # Different start times are different showings.
+    if a.start_minutes is not None and b.start_minutes is not None and a.start_minutes != b.start_minutes:
+        return False
+    if a.title == b.title:
+        return True
+    # "Artist" vs "Artist with special guest X": containment of a
+    # reasonably specific title counts as the same event.
+    shorter, longer = sorted((a.title, b.title), key=len)
+    if len(shorter) >= 8 and f" {shorter} " in f" {longer} ":
+        return True
+    return similarity(a.grams, b.grams) >= TITLE_SIMILARITY_THRESHOLD
+
+
+class DedupeIndex:
+    """Blocked lookup of existing events; new rows are added as they are inserted."""
+
+    def __init__(self, candidates: Iterable[Candidate] = ()):
+        self._blocks: dict[tuple, List[Candidate]] = defaultdict(list)
+        self._by_id: dict[int, Candidate] = {}
+        for candidate in candidates:
+            self.add(candidate)
+
+    def add(self, candidate: Candidate) -> None:
+        for key in candidate.block_keys():
+            self._blocks[key].append(candidate)
+        if candidate.id is not None:
+            self._by_id[candidate.id] = candidate
+
+    def add_sources(self, event_id: int, sources: Iterable[str]) -> None:
+        """Record sources whose listing in this batch was merged into an indexed event."""
+        candidate = self._by_id.get(event_id)
+        if candidate is not None:
+            sources = frozenset(s for s in sources if s)
+            candidate.sources = candidate.sources | sources
+            candidate.batch_sources = candidate.batch_sources | sources
+
+    def find(self, candidate: Candidate) -> Optional[int]:
+        """
+        Id of the best matching existing event in the same block, if any: one
+        the incoming source already listed first, then the most similar.
+        """
+        best_id, best_score = None, (False, -1.0)
+        seen = set()
+        for key in candidate.block_keys():
+            for other in self._blocks.get(key, ()):
+                if other.id in seen or not is_match(candidate, other):
+                    continue
+                seen.add(other.id)
+                score = (
+                    bool(candidate.sources & other.sources),
+                    similarity(candidate.grams, other.grams),
+                )
+                if score > best_score:
+                    best_id, best_score = other.id, score
+        return best_id
+
+
+async def load_index(conn: asyncpg.Connection, days: Iterable[date]) -> DedupeIndex:
+    """Index every stored event on the given days (one query per ingest batch)."""
+    rows = await conn.fetch(
+        """
+        SELECT id, title, datetime, venue, geohash, sources
+        FROM events
+        WHERE event_date = ANY($1::date[])
+        """,
+        sorted(set(days)),
+    )
+    return DedupeIndex(
+        c
+        for c in (
+            make_candidate(
+                r["id"],
+                r["title"],
+                r["datetime"],
+                r["venue"],
+                r["geohash"],
+                r["sources"] or (),
+                in_batch=False,
+            )
+            for r in rows
+        )
+        if c is not None
+    )
@@ -0,0 +1,137 @@
+"""
+In-process cache of serialized event query results.
+
+Entries are keyed on the data generation plus the normalized query, so any
+write that bumps the generation (a scrape or a prune) makes every older entry
+unreachable. The generation lives in the `data_generation` table and changes
+are broadcast with Postgres NOTIFY so that every worker drops stale entries.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import asyncpg
+
+GENERATION_CHANNEL = "events_generation"
+
+_CACHE_TTL_SECONDS = float(os.getenv("EVENTS_CACHE_TTL_SECONDS", "3600"))
+_CACHE_MAX_ENTRIES = int(os.getenv("EVENTS_CACHE_MAX_ENTRIES", "256"))
+_LISTENER_RETRY_SECONDS = 5.0
+
+
+class ResultCache:
+    """A small TTL + LRU map from query keys to cached values."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+results = ResultCache(_CACHE_MAX_ENTRIES, _CACHE_TTL_SECONDS)
+
+_generation = 0
+_listener_task: Optional[asyncio.Task] = None
+
+
+def current_generation() -> int:
+    return _generation
+
+
+def _set_generation(value: int) -> None:
+    global _generation
+    if value != _generation:
+        _generation = value
+        results.clear()
+
+
+async def load_generation(conn: asyncpg.Connection) -> int:
+    value = await conn.fetchval("SELECT generation FROM data_generation")
+    _set_generation(int(value or 0))
+    return _generation
+
+
+async def bump_generation(conn: asyncpg.Connection) -> int:
+    """Record that event data changed and tell the other workers."""
+    value = await conn.fetchval(
+        "UPDATE data_generation SET generation = generation + 1 RETURNING generation"
+    )
+    await conn.execute("SELECT pg_notify($1, $2)", GENERATION_CHANNEL, str(value))
+    _set_generation(int(value))
+    return _generation
+
+
+def _on_generation_notify(connection, pid, channel, payload) -> None:
+    try:
+        _set_generation(int(payload))
+    except ValueError:
+        results.clear()
+
+
+async def _listen_forever(dsn: str, connect_kwargs: dict) -> None:
+    """
+    Hold a dedicated LISTEN connection (pooled connections UNLISTEN on
+    release) and reconnect if it drops, reloading the generation each time
+    so that notifications missed while disconnected are not lost.
+    """
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(dsn, **connect_kwargs)
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: closed.set())
+            await conn.add_listener(GENERATION_CHANNEL, _on_generation_notify)
+            await load_generation(conn)
+            await closed.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️  Cache invalidation listener error: {e}")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(_LISTENER_RETRY_SECONDS)
+
+
+def start_listener(dsn: str, connect_kwargs: dict) -> None:
+    global _listener_task
+    if _listener_task is None:
+        _listener_task = asyncio.create_task(_listen_forever(dsn, connect_kwargs))
+
+
+async def stop_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
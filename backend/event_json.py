@@ -0,0 +1,243 @@
+"""
+Event rows to JSON.
+
+Shared by the events and itineraries endpoints so both emit the same shape.
+List endpoints encode straight to bytes with orjson and return a raw
+Response, skipping FastAPI's per-row response_model validation.
+"""
+from __future__ import annotations
+
+import csv
+import io
+from typing import Any, Iterable, List, Optional, Sequence
+
+import orjson
+
+# `events.id` is an INTEGER (int4); larger ids cannot name an event.
+MAX_EVENT_ID = 2**31 - 1
+
+CSV_COLUMNS = (
+    "id",
+    "title",
+    "datetime",
+    "venue",
+    "venue_id",
+    "location",
+    "latlong",
+    "url",
+    "description",
+    "categories",
+    "source",
+    "sources",
+)
+
+
+# Output field -> table column it is derived from.
+EVENT_FIELD_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "name": "title",
+    "datetime": "datetime",
+    "date": "datetime",
+    "venue": "venue",
+    "venue_id": "venue_id",
+    "location": "location",
+    "latlong": "latlong",
+    "url": "url",
+    "description": "description",
+    "categories": "categories",
+    "category": "categories",
+    "source": "source",
+    "sources": "sources",
+}
+EVENT_FIELDS = tuple(EVENT_FIELD_COLUMNS)
+
+# What card and map views read: no description and no duplicated aliases.
+SUMMARY_FIELDS = (
+    "id",
+    "title",
+    "datetime",
+    "venue",
+    "venue_id",
+    "location",
+    "latlong",
+    "url",
+    "categories",
+    "source",
+    "sources",
+)
+
+
+def columns_for_fields(fields: Sequence[str]) -> List[str]:
+    return list(dict.fromkeys(EVENT_FIELD_COLUMNS[f] for f in fields))
+
+
+def _project_row(row: Any, fields: Sequence[str]) -> dict:
+    out = {}
+    for field in fields:
+        if field == "category":
+            categories = row.get("categories")
+            out[field] = categories[0] if categories else None
+        else:
+            out[field] = row.get(EVENT_FIELD_COLUMNS[field])
+    return out
+
+
+def event_row_to_dict(row: Any) -> dict:
+    categories = row.get("categories")
+    category = categories[0] if categories else None
+    datetime_value = row.get("datetime")
+
+    # Frontend expects `name`, `date`, and `category`.
+    return {
+        "id": row.get("id"),
+        "title": row.get("title"),
+        "name": row.get("title"),
+        "datetime": datetime_value,
+        "date": datetime_value,
+        "venue": row.get("venue"),
+        "venue_id": row.get("venue_id"),
+        "location": row.get("location"),
+        "latlong": row.get("latlong"),
+        "url": row.get("url"),
+        "description": row.get("description"),
+        "categories": categories,
+        "category": category,
+        "source": row.get("source"),
+        "sources": row.get("sources"),
+    }
+
+
+def encode_event(row: Any) -> bytes:
+    return orjson.dumps(event_row_to_dict(row))
+
+
+def encode_events(rows: Iterable[Any], fields: Optional[Sequence[str]] = None) -> bytes:
+    """Encode rows; `fields` limits each object to those output fields."""
+    if fields is None:
+        return orjson.dumps([event_row_to_dict(row) for row in rows])
+    return orjson.dumps([_project_row(row, fields) for row in rows])
+
+
+# Repetitive string fields sent as indexes into a per-response dictionary.
+_DICTIONARY_FOR_FIELD = {
+    "venue": "venue",
+    "source": "source",
+    "sources": "source",
+    "categories": "categories",
+    "category": "categories",
+}
+
+
+def encode_events_columnar(
+    rows: Sequence[Any], fields: Optional[Sequence[str]] = None
+) -> bytes:
+    """
+    Parallel arrays per field instead of an object per row. `venue`,
+    `source(s)` and category values are replaced by indexes into
+    `dictionaries`; nulls stay null.
+    """
+    fields = fields or EVENT_FIELDS
+    dictionaries: dict[str, dict[str, int]] = {}
+
+    def code(name: str, value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        entries = dictionaries.setdefault(name, {})
+        return entries.setdefault(value, len(entries))
+
+    columns = {}
+    for field in fields:
+        column = EVENT_FIELD_COLUMNS[field]
+        dictionary = _DICTIONARY_FOR_FIELD.get(field)
+        if field in ("categories", "sources"):
+            columns[field] = [
+                None
+                if row.get(column) is None
+                else [code(dictionary, c) for c in row.get(column)]
+                for row in rows
+            ]
+        elif field == "category":
+            columns[field] = [
+                code(dictionary, row.get(column)[0]) if row.get(column) else None
+                for row in rows
+            ]
+        elif dictionary is not None:
+            columns[field] = [code(dictionary, row.get(column)) for row in rows]
+        else:
+            columns[field] = [row.get(column) for row in rows]
+
+    return orjson.dumps(
+        {
+            "count": len(rows),
+            "fields": list(fields),
+            "columns": columns,
+            "dictionaries": {name: list(entries) for name, entries in dictionaries.items()},
+        }
+    )
+
+
+def encode_event_batch(rows: Iterable[Any], missing: List[int]) -> bytes:
+    return orjson.dumps(
+        {"events": [event_row_to_dict(row) for row in rows], "missing": missing}
+    )
+
+
+def encode_event_changes(
+    token: str,
+    upserted: Iterable[Any],
+    deleted: List[int],
+    has_more: bool,
+    reset: bool,
+) -> bytes:
+    return orjson.dumps(
+        {
+            "token": token,
+            "upserted": [event_row_to_dict(row) for row in upserted],
+            "deleted": deleted,
+            "has_more": has_more,
+            "reset": reset,
+        }
+    )
+
+
+def encode_nearby_events(rows: Iterable[Any]) -> bytes:
+    return orjson.dumps(
+        [{**event_row_to_dict(row), "distance_m": row["distance_m"]} for row in rows]
+    )
+
+
+def encode_clusters(rows: Iterable[Any], precision: int) -> bytes:
+    return orjson.dumps(
+        {
+            "precision": precision,
+            "clusters": [
+                {
+                    "cell": row["cell"],
+                    "count": row["count"],
+                    "lat": row["lat"],
+                    "lon": row["lon"],
+                    "ids": row["ids"] or [],
+                }
+                for row in rows
+            ],
+        }
+    )
+
+
+def encode_events_ndjson(rows: Iterable[Any]) -> bytes:
+    return b"".join(orjson.dumps(event_row_to_dict(row)) + b"\n" for row in rows)
+
+
+def encode_events_csv(rows: Iterable[Any], include_header: bool = False) -> bytes:
+    """CSV with the raw table columns; categories and sources are joined with `;`."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow(
+            ";".join(row.get(c) or []) if c in ("categories", "sources") else row.get(c)
+            for c in CSV_COLUMNS
+        )
+    return buffer.getvalue().encode("utf-8")
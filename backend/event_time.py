@@ -0,0 +1,59 @@
+"""
+Event start times in the local zone.
+
+`datetime` is stored as each source gave it: Ticketmaster in UTC
+("2026-11-03T04:00:00Z"), DoTheBay and Resident Advisor in local time with
+an offset ("2026-11-02T20:00-0800") or without one ("2026-11-02 20:00"),
+and some sources only a date. Anything that groups events by calendar day
+or compares start times goes through these helpers, so the same show is on
+the same day and at the same minute whichever source listed it.
+"""
+from __future__ import annotations
+
+import os
+import re
+from datetime import date, datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+EVENT_TIMEZONE = ZoneInfo(os.getenv("EVENTS_TIMEZONE", "America/Los_Angeles"))
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_TIME_RE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{1,2}:\d{2}")
+
+
+def local_datetime(datetime_text: Optional[str]) -> Optional[datetime]:
+    """
+    The start as an aware datetime in `EVENT_TIMEZONE`. Times without an
+    offset are already local. None when the text has no parseable time.
+    """
+    if not isinstance(datetime_text, str) or not _TIME_RE.match(datetime_text):
+        return None
+    try:
+        value = datetime.fromisoformat(datetime_text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=EVENT_TIMEZONE)
+    return value.astimezone(EVENT_TIMEZONE)
+
+
+def local_date(datetime_text: Optional[str]) -> Optional[date]:
+    """The local calendar day of a stored datetime; None when it has no date."""
+    value = local_datetime(datetime_text)
+    if value is not None:
+        return value.date()
+    if not isinstance(datetime_text, str) or not _DATE_RE.match(datetime_text):
+        return None
+    try:
+        return date.fromisoformat(datetime_text[:10])
+    except ValueError:
+        return None
+
+
+def local_start_minutes(datetime_text: Optional[str]) -> Optional[int]:
+    """Minutes after local midnight the event starts; None without a time."""
+    value = local_datetime(datetime_text)
+    if value is None:
+        return None
+    return value.hour * 60 + value.minute
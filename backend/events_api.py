@@ -0,0 +1,1387 @@
+"""
+Read side of the API: event listing, search, sync and detail endpoints.
+
+Everything here is needed to serve `/events` and nothing more; scraper and
+ingest code lives in `main.py` and is imported only by the full app.
+`main_read.py` serves this router (plus auth and itineraries) on its own.
+"""
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import Any, List, Literal, Optional
+
+import asyncpg
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, Security
+from fastapi.responses import StreamingResponse
+from fastapi.security import APIKeyHeader
+from pydantic import BaseModel, Field
+from pydantic.fields import FieldInfo
+
+import db_pools
+import event_cache
+import hot_window
+import migrations
+import query_shapes
+import warmup
+from compression import MIN_COMPRESS_BYTES, compress, compress_stream, negotiate_encoding
+from geo import (
+    EARTH_RADIUS_M,
+    geohash_precision_for_zoom,
+    parse_bbox,
+    radius_bbox,
+)
+from event_json import (
+    EVENT_FIELDS,
+    MAX_EVENT_ID,
+    SUMMARY_FIELDS,
+    columns_for_fields,
+    encode_clusters,
+    encode_event,
+    encode_event_batch,
+    encode_event_changes,
+    encode_events,
+    encode_events_columnar,
+    encode_events_csv,
+    encode_events_ndjson,
+    encode_nearby_events,
+)
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+_READ_API_KEY = os.getenv("READ_API_KEY")
+
+if not _READ_API_KEY:
+    raise RuntimeError("READ_API_KEY must be set in environment or .env file")
+
+_api_key_header = APIKeyHeader(name="X-API-Key", auto_error=True)
+
+
+async def verify_read_key(key: str = Security(_api_key_header)) -> None:
+    if key != _READ_API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid or missing API key")
+
+
+# Exact COUNT(*) results per filter signature, reused by include_total=estimate.
+_total_count_cache: dict = {}
+_TOTAL_COUNT_TTL_SECONDS = 600
+_TOTAL_COUNT_CACHE_MAX = 1024
+
+# How long deletions stay visible to /events/changes.
+TOMBSTONE_RETENTION_DAYS = 60
+
+# Event data only changes when the weekly scrape or prune runs, so clients may
+# reuse responses for an hour and then revalidate cheaply with If-None-Match.
+_EVENTS_CACHE_CONTROL = os.getenv(
+    "EVENTS_CACHE_CONTROL", "private, max-age=3600, stale-while-revalidate=604800"
+)
+
+# Optional read replica for the public list/detail endpoints.
+DATABASE_URL_READ = os.getenv("DATABASE_URL_READ")
+
+# Highest data generation the read replica has been seen to have replayed.
+_replica_generation = -1
+
+
+def _get_connect_kwargs() -> dict:
+    return db_pools.connect_kwargs_for(DATABASE_URL or "")
+
+
+if DATABASE_URL:
+    db_pools.configure(DATABASE_URL, DATABASE_URL_READ)
+
+
+@asynccontextmanager
+async def db_connection(pool: str = "write"):
+    """
+    Yields an asyncpg connection from the named pool (`read`, `write` or
+    `auth`, see db_pools) when available; otherwise, falls back to a one-off
+    connection.
+    """
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL must be set in environment or .env file")
+
+    async with db_pools.connection(pool) as conn:
+        yield conn
+
+
+@asynccontextmanager
+async def read_connection():
+    """
+    Connection for public read queries. If the read pool is a replica that
+    has not yet replayed the current data generation, the primary is used
+    instead so a new generation is never cached with stale rows.
+    """
+    global _replica_generation
+    generation = event_cache.current_generation()
+    if not db_pools.has_replica() or _replica_generation >= generation:
+        async with db_connection("read") as conn:
+            yield conn
+        return
+
+    async with db_connection("read") as conn:
+        seen = await conn.fetchval("SELECT generation FROM data_generation")
+        _replica_generation = max(_replica_generation, int(seen or 0))
+        caught_up = _replica_generation >= generation
+        if caught_up:
+            yield conn
+    if not caught_up:
+        async with db_connection("write") as conn:
+            yield conn
+
+
+
+
+class EventOut(BaseModel):
+    """
+    Response shape tailored for the existing frontend components.
+
+    The DB uses `datetime` and `categories`, but the UI expects:
+    - `date` (string) and `category` (string)
+    - `name` as a fallback for `title`
+    """
+
+    id: int
+    title: str
+    name: Optional[str] = None
+    datetime: Optional[str] = None
+    date: Optional[str] = None
+    venue: Optional[str] = None
+    venue_id: Optional[int] = None
+    location: Optional[str] = None
+    latlong: Optional[str] = None
+    url: Optional[str] = None
+    description: Optional[str] = None
+    categories: Optional[List[str]] = None
+    category: Optional[str] = None
+    source: Optional[str] = None
+    sources: Optional[List[str]] = None
+
+
+_EVENT_SELECT_COLUMNS = (
+    "id, title, datetime, venue, venue_id, location, latlong, url, description, categories, source, sources"
+)
+
+_EVENT_BATCH_MAX_IDS = 500
+
+
+class NearbyEventOut(EventOut):
+    distance_m: float
+
+
+class EventChangesOut(BaseModel):
+    token: str
+    upserted: List[EventOut]
+    deleted: List[int]
+    has_more: bool
+    reset: bool
+
+
+class EventClusterOut(BaseModel):
+    cell: str
+    count: int
+    lat: float
+    lon: float
+    ids: List[int]
+
+
+class EventClustersOut(BaseModel):
+    precision: int
+    clusters: List[EventClusterOut]
+
+
+class EventBatchBody(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=_EVENT_BATCH_MAX_IDS)
+
+
+class EventBatchOut(BaseModel):
+    events: List[EventOut]
+    missing: List[int]
+
+
+class VenueOut(BaseModel):
+    id: int
+    name: str
+    location: Optional[str] = None
+    latlong: Optional[str] = None
+    upcoming_events: int
+
+
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _validate_iso_date(value: str, param_name: str) -> str:
+    try:
+        valid = bool(_ISO_DATE_RE.fullmatch(value)) and bool(date.fromisoformat(value))
+    except ValueError:
+        valid = False
+    if not valid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid `{param_name}`. Expected YYYY-MM-DD.",
+        )
+    return value
+
+
+def _resolve_projection(view: str, fields: Optional[str]) -> Optional[tuple]:
+    """Output fields for a list response, or None for the full EventOut shape."""
+    if fields is None:
+        return SUMMARY_FIELDS if view == "summary" else None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(EVENT_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown `fields`: {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(EVENT_FIELDS)}",
+        )
+    requested.add("id")
+    return tuple(f for f in EVENT_FIELDS if f in requested)
+
+
+def _validate_bbox(value: str) -> tuple[float, float, float, float]:
+    bbox = parse_bbox(value)
+    if bbox is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid `bbox`. Expected minLon,minLat,maxLon,maxLat.",
+        )
+    return bbox
+
+
+def _build_event_filters(
+    on_date: Optional[str] = None,
+    source: Optional[str] = None,
+    keyword: Optional[str] = None,
+    category: Optional[str] = None,
+    venue: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    bbox: Optional[tuple[float, float, float, float]] = None,
+    venue_id: Optional[int] = None,
+) -> tuple[str, List[Any]]:
+    """WHERE clause and positional args for the shared event filters."""
+    where_clauses: List[str] = []
+    args: List[Any] = []
+
+    def add_arg(condition_template: str, value: Any) -> None:
+        param_idx = len(args) + 1
+        where_clauses.append(condition_template.format(param=f"${param_idx}"))
+        args.append(value)
+
+    # `on_date` is the range [on_date, on_date]; folding it into the bounds
+    # keeps the number of distinct statement shapes down.
+    lower = max((d for d in (on_date, start_date) if d is not None), default=None)
+    upper = min((d for d in (on_date, end_date) if d is not None), default=None)
+    # Bounds on the partition key let the planner skip whole months.
+    if lower is not None:
+        add_arg("event_date >= {param}", date.fromisoformat(lower))
+    if upper is not None:
+        add_arg("event_date <= {param}", date.fromisoformat(upper))
+
+    if source is not None:
+        add_arg("{param} = ANY(sources)", source)
+
+    if venue_id is not None:
+        add_arg("venue_id = {param}", venue_id)
+
+    if venue is not None:
+        add_arg("(venue ILIKE {param})", f"%{venue}%")
+
+    if keyword is not None:
+        kw = f"%{keyword}%"
+        where_clauses.append(
+            "("
+            "title ILIKE {param} OR "
+            "venue ILIKE {param} OR "
+            "location ILIKE {param} OR "
+            "description ILIKE {param} OR "
+            "url ILIKE {param}"
+            ")".format(param="{param}")
+        )
+        param_idx = len(args) + 1
+        where_clauses[-1] = where_clauses[-1].format(param=f"${param_idx}")
+        args.append(kw)
+
+    if category is not None:
+        add_arg("{param} = ANY(categories)", category)
+
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        add_arg("geo <@ {param}::box", ((max_lon, max_lat), (min_lon, min_lat)))
+
+    where_sql = " AND ".join(where_clauses) if where_clauses else "TRUE"
+    return where_sql, args
+
+
+async def _count_events(
+    conn: asyncpg.Connection,
+    where_sql: str,
+    args: List[Any],
+    mode: str,
+) -> Optional[int]:
+    """
+    Total rows matching the filters for `include_total`.
+
+    `exact` runs COUNT(*) and remembers the result per filter signature.
+    `estimate` reuses a fresh remembered count when there is one and
+    otherwise falls back to the planner's row estimate, which costs a plan
+    but no scan.
+    """
+    if mode == "none":
+        return None
+
+    signature = (event_cache.current_generation(), where_sql, tuple(args))
+    now = time.monotonic()
+
+    if mode == "estimate":
+        cached = _total_count_cache.get(signature)
+        if cached is not None and now - cached[1] < _TOTAL_COUNT_TTL_SECONDS:
+            return cached[0]
+        plan = await conn.fetchval(
+            f"EXPLAIN (FORMAT JSON) SELECT 1 FROM events WHERE {where_sql}", *args
+        )
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    total = await query_shapes.fetchval(
+        conn, "events.count", f"SELECT COUNT(*) FROM events WHERE {where_sql}", *args
+    )
+    if len(_total_count_cache) >= _TOTAL_COUNT_CACHE_MAX:
+        _total_count_cache.clear()
+    _total_count_cache[signature] = (total, now)
+    return total
+
+
+def _etag_for(key: tuple, encoding: Optional[str] = None) -> str:
+    """
+    Strong ETag for a cache key; keys always start with the data generation.
+    Each content encoding is a different representation, so it gets its own.
+    """
+    key = (*key, encoding)
+    return '"' + hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison function. "*" is ignored: the
+    # check runs before the resource is looked up, so it would turn a 404
+    # into a 304, and caches revalidating a GET always send real tags.
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _not_modified_response(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": _EVENTS_CACHE_CONTROL},
+    )
+
+
+def _events_json_response(
+    body: bytes,
+    total_count: Optional[int],
+    etag: str,
+    encoding: Optional[str] = None,
+    cache_key: Optional[tuple] = None,
+) -> Response:
+    """
+    JSON response with caching headers, compressed with `encoding` when the
+    body is large enough. Compressed bytes are cached under `cache_key`.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": _EVENTS_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if total_count is not None:
+        headers["X-Total-Count"] = str(total_count)
+    if encoding is not None and len(body) >= MIN_COMPRESS_BYTES:
+        compressed = (
+            event_cache.results.get((cache_key, encoding)) if cache_key else None
+        )
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if cache_key:
+                event_cache.results.set((cache_key, encoding), compressed)
+        body = compressed
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def init_db():
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL must be set in environment or .env file")
+
+    try:
+        conn = await asyncpg.connect(DATABASE_URL, **_get_connect_kwargs())
+    except asyncpg.exceptions.InvalidCatalogNameError as e:
+        import re
+
+        db_match = re.search(r'database "([^"]+)"', str(e))
+        db_name = db_match.group(1) if db_match else "unknown"
+        raise RuntimeError(
+            f'Database "{db_name}" does not exist. '
+            f"Please create it first:\n"
+            f'  psql postgres -c "CREATE DATABASE \\"{db_name}\\";"\n'
+            f"Or run: ./create_database.sh"
+        ) from e
+    except Exception as e:
+        raise RuntimeError(
+            f"Failed to connect to database: {str(e)}\n"
+            f"Make sure PostgreSQL is running and DATABASE_URL is correct."
+        ) from e
+
+    # Schema changes run from `python migrations.py`; startup only checks
+    # the version so a cold worker is ready after one query.
+    try:
+        await migrations.check_version(conn)
+    finally:
+        await conn.close()
+
+
+async def startup() -> None:
+    await init_db()
+    await db_pools.open_pools(statement_cache_size=query_shapes.STATEMENT_CACHE_SIZE)
+    async with db_connection() as conn:
+        await event_cache.load_generation(conn)
+    event_cache.start_listener(DATABASE_URL, _get_connect_kwargs())
+    warmup.start(_warmup_steps())
+
+
+async def shutdown() -> None:
+    await warmup.stop()
+    await event_cache.stop_listener()
+    await hot_window.stop()
+    await db_pools.close_pools()
+
+
+router = APIRouter()
+
+
+# ---------------------------------------------------------------------------
+# Read endpoints — protected by READ_API_KEY
+# ---------------------------------------------------------------------------
+
+
+async def _query_events_db(
+    on_date: Optional[str],
+    source: Optional[str],
+    keyword: Optional[str],
+    category: Optional[str],
+    venue: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    bbox: Optional[tuple[float, float, float, float]],
+    venue_id: Optional[int],
+    order_by_sql: str,
+    limit: int,
+    offset: int,
+    include_total: str,
+    projection: Optional[tuple],
+) -> tuple[List[asyncpg.Record], Optional[int]]:
+    where_sql, args = _build_event_filters(
+        on_date=on_date,
+        source=source,
+        keyword=keyword,
+        category=category,
+        venue=venue,
+        start_date=start_date,
+        end_date=end_date,
+        bbox=bbox,
+        venue_id=venue_id,
+    )
+    select_columns = (
+        _EVENT_SELECT_COLUMNS
+        if projection is None
+        else ", ".join(columns_for_fields(projection))
+    )
+
+    async with read_connection() as conn:
+        total_count = await _count_events(conn, where_sql, args, include_total)
+
+        limit_param = len(args) + 1
+        offset_param = len(args) + 2
+        events_query = (
+            f"SELECT {select_columns} FROM events WHERE {where_sql} "
+            f"ORDER BY {order_by_sql} "
+            f"LIMIT ${limit_param} OFFSET ${offset_param}"
+        )
+        rows = await query_shapes.fetch(
+            conn, "events.list", events_query, *args, limit, offset
+        )
+    return rows, total_count
+
+
+@router.get(
+    "/events",
+    response_model=List[EventOut],
+    dependencies=[Depends(verify_read_key)],
+)
+async def list_events(
+    on_date: Optional[str] = Query(
+        default=None, description="Filter by date (YYYY-MM-DD)"
+    ),
+    source: Optional[str] = Query(default=None, description="Filter by source (any source that listed the event)"),
+    keyword: Optional[str] = Query(
+        default=None, description="Search in title/venue/location/description/url"
+    ),
+    category: Optional[str] = Query(
+        default=None, description="Filter by category (exact match within categories[])"
+    ),
+    venue: Optional[str] = Query(
+        default=None, description="Filter by venue (case-insensitive substring)"
+    ),
+    venue_id: Optional[int] = Query(default=None, description="Filter by venue id (see /venues)"),
+    start_date: Optional[str] = Query(
+        default=None, description="Filter start (YYYY-MM-DD)"
+    ),
+    end_date: Optional[str] = Query(
+        default=None, description="Filter end (YYYY-MM-DD)"
+    ),
+    bbox: Optional[str] = Query(
+        default=None,
+        description="Only events inside minLon,minLat,maxLon,maxLat",
+    ),
+    limit: int = Query(default=100, ge=1, le=1000, description="Max events to return"),
+    offset: int = Query(default=0, ge=0, description="Pagination offset"),
+    sort: str = Query(
+        default="datetime_desc",
+        description="Sort: datetime_desc | datetime_asc | title_asc | title_desc",
+    ),
+    include_total: Literal["exact", "estimate", "none"] = Query(
+        default="none",
+        description="Return the matching row count in X-Total-Count: exact | estimate | none",
+    ),
+    view: Literal["full", "summary"] = Query(
+        default="full",
+        description="full | summary (card/map fields only, no description)",
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated output fields; overrides `view`",
+    ),
+    format: Literal["json", "columnar"] = Query(
+        default="json",
+        description="json (array of objects) | columnar (parallel arrays per field)",
+    ),
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    if on_date is not None:
+        on_date = _validate_iso_date(on_date, "on_date")
+    if start_date is not None:
+        start_date = _validate_iso_date(start_date, "start_date")
+    if end_date is not None:
+        end_date = _validate_iso_date(end_date, "end_date")
+    bbox_value = _validate_bbox(bbox) if bbox is not None else None
+    projection = _resolve_projection(view, fields)
+
+    # `id` breaks ties so identical queries produce identical bytes (and ETags).
+    allowed_sorts = {
+        "datetime_desc": "datetime DESC NULLS LAST, id",
+        "datetime_asc": "datetime ASC NULLS LAST, id",
+        "title_asc": "title ASC NULLS LAST, id",
+        "title_desc": "title DESC NULLS LAST, id",
+    }
+    if sort not in allowed_sorts:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid `sort`. Allowed: {', '.join(sorted(allowed_sorts.keys()))}",
+        )
+
+    # /events and /api/events share entries; the generation is read before
+    # querying so a concurrent write can only strand an entry, never serve it.
+    cache_key = (
+        event_cache.current_generation(),
+        "events",
+        on_date,
+        source,
+        keyword,
+        category,
+        venue,
+        venue_id,
+        start_date,
+        end_date,
+        bbox_value,
+        limit,
+        offset,
+        sort,
+        include_total,
+        projection,
+        format,
+    )
+    encoding = negotiate_encoding(accept_encoding)
+    etag = _etag_for(cache_key, encoding)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified_response(etag)
+
+    cached = event_cache.results.get(cache_key)
+    if cached is not None:
+        return _events_json_response(*cached, etag, encoding, cache_key)
+
+    served = None
+    hot_window.refresh_if_stale(read_connection, cache_key[0])
+    window = hot_window.current()
+    if window is not None and window.generation == cache_key[0]:
+        served = window.query(
+            on_date=on_date,
+            source=source,
+            keyword=keyword,
+            category=category,
+            venue=venue,
+            venue_id=venue_id,
+            start_date=start_date,
+            end_date=end_date,
+            bbox=bbox_value,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+        )
+    if served is not None:
+        rows, total = served
+        total_count = None if include_total == "none" else total
+    else:
+        rows, total_count = await _query_events_db(
+            on_date=on_date,
+            source=source,
+            keyword=keyword,
+            category=category,
+            venue=venue,
+            venue_id=venue_id,
+            start_date=start_date,
+            end_date=end_date,
+            bbox=bbox_value,
+            order_by_sql=allowed_sorts[sort],
+            limit=limit,
+            offset=offset,
+            include_total=include_total,
+            projection=projection,
+        )
+
+    if format == "columnar":
+        body = encode_events_columnar(rows, projection)
+    else:
+        body = encode_events(rows, projection)
+    event_cache.results.set(cache_key, (body, total_count))
+    return _events_json_response(body, total_count, etag, encoding, cache_key)
+
+
+@router.get(
+    "/api/events",
+    response_model=List[EventOut],
+    include_in_schema=False,
+    dependencies=[Depends(verify_read_key)],
+)
+async def list_events_api(
+    on_date: Optional[str] = Query(
+        default=None, description="Filter by date (YYYY-MM-DD)"
+    ),
+    source: Optional[str] = Query(default=None, description="Filter by source (any source that listed the event)"),
+    keyword: Optional[str] = Query(
+        default=None, description="Search in title/venue/location/description/url"
+    ),
+    category: Optional[str] = Query(
+        default=None, description="Filter by category (exact match within categories[])"
+    ),
+    venue: Optional[str] = Query(
+        default=None, description="Filter by venue (case-insensitive substring)"
+    ),
+    venue_id: Optional[int] = Query(default=None, description="Filter by venue id (see /venues)"),
+    start_date: Optional[str] = Query(
+        default=None, description="Filter start (YYYY-MM-DD)"
+    ),
+    end_date: Optional[str] = Query(
+        default=None, description="Filter end (YYYY-MM-DD)"
+    ),
+    bbox: Optional[str] = Query(
+        default=None,
+        description="Only events inside minLon,minLat,maxLon,maxLat",
+    ),
+    limit: int = Query(default=100, ge=1, le=1000, description="Max events to return"),
+    offset: int = Query(default=0, ge=0, description="Pagination offset"),
+    sort: str = Query(
+        default="datetime_desc",
+        description="Sort: datetime_desc | datetime_asc | title_asc | title_desc",
+    ),
+    include_total: Literal["exact", "estimate", "none"] = Query(
+        default="none",
+        description="Return the matching row count in X-Total-Count: exact | estimate | none",
+    ),
+    view: Literal["full", "summary"] = Query(
+        default="full",
+        description="full | summary (card/map fields only, no description)",
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated output fields; overrides `view`",
+    ),
+    format: Literal["json", "columnar"] = Query(
+        default="json",
+        description="json (array of objects) | columnar (parallel arrays per field)",
+    ),
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    return await list_events(
+        on_date=on_date,
+        source=source,
+        keyword=keyword,
+        category=category,
+        venue=venue,
+        venue_id=venue_id,
+        start_date=start_date,
+        end_date=end_date,
+        limit=limit,
+        offset=offset,
+        sort=sort,
+        include_total=include_total,
+        bbox=bbox,
+        view=view,
+        fields=fields,
+        format=format,
+        if_none_match=if_none_match,
+        accept_encoding=accept_encoding,
+    )
+
+
+@router.get(
+    "/events/export",
+    dependencies=[Depends(verify_read_key)],
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def export_events(
+    format: Literal["ndjson", "csv"] = Query(
+        default="ndjson", description="Output format: ndjson | csv"
+    ),
+    fetch_size: int = Query(
+        default=1000, ge=1, le=10000, description="Rows fetched per cursor round-trip"
+    ),
+    on_date: Optional[str] = Query(
+        default=None, description="Filter by date (YYYY-MM-DD)"
+    ),
+    source: Optional[str] = Query(default=None, description="Filter by source (any source that listed the event)"),
+    keyword: Optional[str] = Query(
+        default=None, description="Search in title/venue/location/description/url"
+    ),
+    category: Optional[str] = Query(
+        default=None, description="Filter by category (exact match within categories[])"
+    ),
+    venue: Optional[str] = Query(
+        default=None, description="Filter by venue (case-insensitive substring)"
+    ),
+    venue_id: Optional[int] = Query(default=None, description="Filter by venue id (see /venues)"),
+    start_date: Optional[str] = Query(
+        default=None, description="Filter start (YYYY-MM-DD)"
+    ),
+    end_date: Optional[str] = Query(
+        default=None, description="Filter end (YYYY-MM-DD)"
+    ),
+    bbox: Optional[str] = Query(
+        default=None,
+        description="Only events inside minLon,minLat,maxLon,maxLat",
+    ),
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    """
+    Stream every matching event in one response, ordered by id.
+
+    Rows come from a server-side cursor inside a read-only transaction and
+    are encoded one batch at a time, so memory stays flat however large the
+    table is.
+    """
+    if on_date is not None:
+        on_date = _validate_iso_date(on_date, "on_date")
+    if start_date is not None:
+        start_date = _validate_iso_date(start_date, "start_date")
+    if end_date is not None:
+        end_date = _validate_iso_date(end_date, "end_date")
+    bbox_value = _validate_bbox(bbox) if bbox is not None else None
+
+    where_sql, args = _build_event_filters(
+        on_date=on_date,
+        source=source,
+        keyword=keyword,
+        category=category,
+        venue=venue,
+        start_date=start_date,
+        end_date=end_date,
+        bbox=bbox_value,
+        venue_id=venue_id,
+    )
+    query = f"SELECT {_EVENT_SELECT_COLUMNS} FROM events WHERE {where_sql} ORDER BY id"
+
+    async def stream_rows():
+        async with read_connection() as conn:
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor(query, *args)
+                first_batch = True
+                while True:
+                    rows = await cursor.fetch(fetch_size)
+                    if format == "csv":
+                        yield encode_events_csv(rows, include_header=first_batch)
+                    elif rows:
+                        yield encode_events_ndjson(rows)
+                    first_batch = False
+                    if len(rows) < fetch_size:
+                        break
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {
+        "Content-Disposition": f'attachment; filename="events.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    body = stream_rows()
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is not None:
+        body = compress_stream(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+def _validate_event_ids(ids: List[int]) -> None:
+    """400 for ids outside the int4 range of `events.id` (asyncpg would raise)."""
+    for event_id in ids:
+        if not 1 <= event_id <= MAX_EVENT_ID:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid event id {event_id}. Expected 1 to {MAX_EVENT_ID}.",
+            )
+
+
+async def _fetch_event_batch(ids: List[int]) -> Response:
+    """Resolve ids in one query; events keep request order, unknown ids are listed."""
+    ids = list(dict.fromkeys(ids))
+    async with read_connection() as conn:
+        rows = await conn.fetch(
+            f"SELECT {_EVENT_SELECT_COLUMNS} FROM events WHERE id = ANY($1::int[])",
+            ids,
+        )
+    by_id = {row["id"]: row for row in rows}
+    ordered = [by_id[i] for i in ids if i in by_id]
+    missing = [i for i in ids if i not in by_id]
+    return Response(
+        content=encode_event_batch(ordered, missing), media_type="application/json"
+    )
+
+
+@router.get(
+    "/events/changes",
+    response_model=EventChangesOut,
+    dependencies=[Depends(verify_read_key)],
+)
+async def list_event_changes(
+    since: Optional[str] = Query(
+        default=None,
+        description="Sync token from a previous call; omit to get the current token",
+    ),
+    start_date: Optional[str] = Query(
+        default=None, description="Only report upserts on or after (YYYY-MM-DD)"
+    ),
+    end_date: Optional[str] = Query(
+        default=None, description="Only report upserts on or before (YYYY-MM-DD)"
+    ),
+    limit: int = Query(default=1000, ge=1, le=5000, description="Max changes to return"),
+):
+    """
+    Events inserted or updated, and ids deleted, since a sync token.
+
+    Pass the returned `token` as `since` next time, repeating while
+    `has_more` is true. `reset` means the token predates the tombstone
+    retention window and the client should refetch its window instead.
+    """
+    since_seq: Optional[int] = None
+    if since is not None:
+        if not since.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid `since` token.")
+        since_seq = int(since)
+    if start_date is not None:
+        start_date = _validate_iso_date(start_date, "start_date")
+    if end_date is not None:
+        end_date = _validate_iso_date(end_date, "end_date")
+
+    # The token must come from the primary, and the rows up to it must be
+    # visible where they are read, so a replica is not used here.
+    async with db_connection("write" if db_pools.has_replica() else "read") as conn:
+        async with conn.transaction():
+            # Waits for writers that claimed change_seq values but have not
+            # committed, so the token never passes a row not yet visible.
+            await conn.execute(
+                "SELECT pg_advisory_xact_lock($1)", migrations.CHANGE_SEQ_LOCK_ID
+            )
+            state = await conn.fetchrow(
+                """
+                SELECT
+                    (SELECT CASE WHEN is_called THEN last_value ELSE 0 END
+                     FROM event_change_seq) AS current_seq,
+                    tombstone_horizon
+                FROM data_generation
+                """
+            )
+        current_seq = state["current_seq"]
+        if since_seq is None or since_seq < state["tombstone_horizon"]:
+            return Response(
+                content=encode_event_changes(
+                    str(current_seq), [], [], has_more=False, reset=since_seq is not None
+                ),
+                media_type="application/json",
+            )
+
+        where_sql, args = _build_event_filters(start_date=start_date, end_date=end_date)
+        seq_args = [since_seq, current_seq, limit + 1]
+        first = len(args) + 1
+        upserted = await conn.fetch(
+            f"""
+            SELECT {_EVENT_SELECT_COLUMNS}, change_seq
+            FROM events
+            WHERE change_seq > ${first} AND change_seq <= ${first + 1} AND {where_sql}
+            ORDER BY change_seq
+            LIMIT ${first + 2}
+            """,
+            *args,
+            *seq_args,
+        )
+        deleted = await conn.fetch(
+            """
+            SELECT event_id, change_seq
+            FROM event_tombstones
+            WHERE change_seq > $1 AND change_seq <= $2
+            ORDER BY change_seq
+            LIMIT $3
+            """,
+            *seq_args,
+        )
+
+    changes = sorted(
+        [(row["change_seq"], row, None) for row in upserted]
+        + [(row["change_seq"], None, row["event_id"]) for row in deleted],
+        key=lambda change: change[0],
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    token = changes[-1][0] if has_more else current_seq
+
+    return Response(
+        content=encode_event_changes(
+            str(token),
+            [row for _, row, _ in changes if row is not None],
+            [event_id for _, _, event_id in changes if event_id is not None],
+            has_more=has_more,
+            reset=False,
+        ),
+        media_type="application/json",
+    )
+
+
+@router.get(
+    "/events/nearby",
+    response_model=List[NearbyEventOut],
+    dependencies=[Depends(verify_read_key)],
+)
+async def list_nearby_events(
+    lat: float = Query(ge=-90, le=90, description="Latitude of the search point"),
+    lon: float = Query(ge=-180, le=180, description="Longitude of the search point"),
+    radius_m: float = Query(
+        default=2000, gt=0, le=50000, description="Search radius in meters"
+    ),
+    limit: int = Query(default=50, ge=1, le=500, description="Max events to return"),
+    on_date: Optional[str] = Query(
+        default=None, description="Filter by date (YYYY-MM-DD)"
+    ),
+    start_date: Optional[str] = Query(
+        default=None, description="Filter start (YYYY-MM-DD)"
+    ),
+    end_date: Optional[str] = Query(
+        default=None, description="Filter end (YYYY-MM-DD)"
+    ),
+    source: Optional[str] = Query(default=None, description="Filter by source (any source that listed the event)"),
+    category: Optional[str] = Query(
+        default=None, description="Filter by category (exact match within categories[])"
+    ),
+):
+    """
+    Events within `radius_m` of a point, nearest first, with great-circle
+    distances. The GiST index on `geo` narrows candidates to the circle's
+    bounding box; they are then ranked by haversine distance, because `<->`
+    measures planar degrees and would misorder neighbours away from the
+    equator.
+    """
+    if on_date is not None:
+        on_date = _validate_iso_date(on_date, "on_date")
+    if start_date is not None:
+        start_date = _validate_iso_date(start_date, "start_date")
+    if end_date is not None:
+        end_date = _validate_iso_date(end_date, "end_date")
+
+    where_sql, args = _build_event_filters(
+        on_date=on_date,
+        source=source,
+        category=category,
+        start_date=start_date,
+        end_date=end_date,
+        bbox=radius_bbox(lon, lat, radius_m),
+    )
+    lat_param, lon_param, radius_param, limit_param = (
+        f"${len(args) + i}" for i in range(1, 5)
+    )
+    distance_sql = (
+        f"2 * {EARTH_RADIUS_M} * ASIN(SQRT("
+        f"POWER(SIN(RADIANS(geo[1] - {lat_param}) / 2), 2) + "
+        f"COS(RADIANS({lat_param})) * COS(RADIANS(geo[1])) * "
+        f"POWER(SIN(RADIANS(geo[0] - {lon_param}) / 2), 2)"
+        f"))"
+    )
+    query = f"""
+        SELECT * FROM (
+            SELECT {_EVENT_SELECT_COLUMNS}, {distance_sql} AS distance_m
+            FROM events
+            WHERE {where_sql}
+        ) candidates
+        WHERE distance_m <= {radius_param}
+        ORDER BY distance_m, id
+        LIMIT {limit_param}
+    """
+
+    async with read_connection() as conn:
+        rows = await conn.fetch(query, *args, lat, lon, radius_m, limit)
+
+    return Response(content=encode_nearby_events(rows), media_type="application/json")
+
+
+@router.get(
+    "/events/clusters",
+    response_model=EventClustersOut,
+    dependencies=[Depends(verify_read_key)],
+)
+async def list_event_clusters(
+    zoom: int = Query(ge=0, le=22, description="Web-map zoom level"),
+    bbox: Optional[str] = Query(
+        default=None,
+        description="Only events inside minLon,minLat,maxLon,maxLat",
+    ),
+    start_date: Optional[str] = Query(
+        default=None, description="Filter start (YYYY-MM-DD)"
+    ),
+    end_date: Optional[str] = Query(
+        default=None, description="Filter end (YYYY-MM-DD)"
+    ),
+    source: Optional[str] = Query(default=None, description="Filter by source (any source that listed the event)"),
+    category: Optional[str] = Query(
+        default=None, description="Filter by category (exact match within categories[])"
+    ),
+    sample_size: int = Query(
+        default=3, ge=0, le=20, description="Representative event ids per cluster"
+    ),
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    """
+    Aggregate located events into geohash cells sized for `zoom`, returning a
+    count, centroid and a few of the earliest event ids per cell.
+    """
+    if start_date is not None:
+        start_date = _validate_iso_date(start_date, "start_date")
+    if end_date is not None:
+        end_date = _validate_iso_date(end_date, "end_date")
+    bbox_value = _validate_bbox(bbox) if bbox is not None else None
+    precision = geohash_precision_for_zoom(zoom)
+
+    cache_key = (
+        event_cache.current_generation(),
+        "clusters",
+        precision,
+        bbox_value,
+        start_date,
+        end_date,
+        source,
+        category,
+        sample_size,
+    )
+    encoding = negotiate_encoding(accept_encoding)
+    etag = _etag_for(cache_key, encoding)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified_response(etag)
+
+    cached = event_cache.results.get(cache_key)
+    if cached is not None:
+        return _events_json_response(cached, None, etag, encoding, cache_key)
+
+    where_sql, args = _build_event_filters(
+        source=source,
+        category=category,
+        start_date=start_date,
+        end_date=end_date,
+        bbox=bbox_value,
+    )
+    precision_param = len(args) + 1
+    sample_param = len(args) + 2
+    query = f"""
+        SELECT
+            LEFT(geohash, ${precision_param}) AS cell,
+            COUNT(*)::int AS count,
+            AVG(geo[1]) AS lat,
+            AVG(geo[0]) AS lon,
+            (ARRAY_AGG(id ORDER BY datetime ASC NULLS LAST, id))[1:${sample_param}] AS ids
+        FROM events
+        WHERE geohash IS NOT NULL AND {where_sql}
+        GROUP BY cell
+        ORDER BY count DESC, cell
+    """
+
+    async with read_connection() as conn:
+        rows = await conn.fetch(query, *args, precision, sample_size)
+
+    body = encode_clusters(rows, precision)
+    event_cache.results.set(cache_key, body)
+    return _events_json_response(body, None, etag, encoding, cache_key)
+
+
+@router.post(
+    "/events/batch",
+    response_model=EventBatchOut,
+    dependencies=[Depends(verify_read_key)],
+)
+async def get_events_batch(body: EventBatchBody):
+    _validate_event_ids(body.ids)
+    return await _fetch_event_batch(body.ids)
+
+
+@router.get(
+    "/events/batch",
+    response_model=EventBatchOut,
+    dependencies=[Depends(verify_read_key)],
+)
+async def get_events_batch_query(
+    ids: str = Query(description="Comma-separated event ids"),
+):
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Invalid `ids`. Expected comma-separated integers."
+        )
+    if not parsed:
+        raise HTTPException(status_code=400, detail="`ids` must not be empty.")
+    if len(parsed) > _EVENT_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {_EVENT_BATCH_MAX_IDS} ids per request.",
+        )
+    _validate_event_ids(parsed)
+    return await _fetch_event_batch(parsed)
+
+
+@router.get(
+    "/events/{event_id}",
+    response_model=EventOut,
+    dependencies=[Depends(verify_read_key)],
+)
+async def get_event(
+    event_id: int,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    _validate_event_ids([event_id])
+    encoding = negotiate_encoding(accept_encoding)
+    etag = _etag_for((event_cache.current_generation(), "event", event_id), encoding)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified_response(etag)
+
+    async with read_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            SELECT
+                id, title, datetime, venue, venue_id, location, latlong, url, description, categories, source, sources
+            FROM events
+            WHERE id = $1
+            """,
+            event_id,
+        )
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    return _events_json_response(encode_event(row), None, etag, encoding)
+
+
+@router.get(
+    "/api/events/{event_id}",
+    response_model=EventOut,
+    include_in_schema=False,
+    dependencies=[Depends(verify_read_key)],
+)
+async def get_event_api(
+    event_id: int,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    return await get_event(
+        event_id, if_none_match=if_none_match, accept_encoding=accept_encoding
+    )
+
+
+@router.get(
+    "/venues",
+    response_model=List[VenueOut],
+    dependencies=[Depends(verify_read_key)],
+)
+async def list_venues(
+    q: Optional[str] = Query(default=None, description="Venue name (case-insensitive substring)"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Max venues to return"),
+):
+    """Venues with their count of events from today on, busiest first."""
+    async with read_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT v.id, v.name, v.location, v.latlong, COUNT(e.id) AS upcoming_events
+            FROM venues v
+            LEFT JOIN events e
+                ON e.venue_id = v.id
+                AND e.event_date >= $1
+            WHERE $2::text IS NULL OR v.name ILIKE $2
+            GROUP BY v.id
+            ORDER BY upcoming_events DESC, v.name
+            LIMIT $3
+            """,
+            date.today(),
+            None if q is None else f"%{q}%",
+            limit,
+        )
+    return [dict(row) for row in rows]
+
+
+# ---------------------------------------------------------------------------
+# Startup warming
+# ---------------------------------------------------------------------------
+
+_WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))
+
+# Extra list_events parameter sets to preload, e.g.
+# WARMUP_QUERIES='[{"category": "music", "limit": 50}]'.
+_WARMUP_EXTRA_QUERIES = json.loads(os.getenv("WARMUP_QUERIES", "[]"))
+
+
+def _add_months(day: date, months: int) -> date:
+    """Same overflow rule as the frontend's addMonthsToIsoDate (JS setMonth)."""
+    month_index = day.month - 1 + months
+    first = date(day.year + month_index // 12, month_index % 12 + 1, 1)
+    return first + timedelta(days=day.day - 1)
+
+
+def _endpoint_defaults(endpoint) -> dict:
+    """Plain default values of an endpoint's Query/Header parameters."""
+    return {
+        name: param.default.default if isinstance(param.default, FieldInfo) else param.default
+        for name, param in inspect.signature(endpoint).parameters.items()
+    }
+
+
+def _warmup_queries() -> List[dict]:
+    today = date.today()
+    return [
+        # What the frontend requests on first load (see hooks/useEvents.ts).
+        {
+            "start_date": today.isoformat(),
+            "end_date": _add_months(today, 1).isoformat(),
+            "limit": 1000,
+            "sort": "datetime_asc",
+            "view": "summary",
+            "format": "columnar",
+        },
+        # Plain GET /events.
+        {},
+        *_WARMUP_EXTRA_QUERIES,
+    ]
+
+
+async def _warm_pool() -> str:
+    async def touch() -> None:
+        async with db_connection("read") as conn:
+            await conn.execute("SELECT 1")
+
+    await asyncio.gather(*(touch() for _ in range(_WARMUP_CONNECTIONS)))
+    return f"{_WARMUP_CONNECTIONS} read connections"
+
+
+async def _warm_relations() -> str:
+    """Pull the events partitions and their indexes into shared buffers."""
+    async with db_connection("read") as conn:
+        installed = await conn.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_prewarm')"
+        )
+        if not installed:
+            return "pg_prewarm not installed"
+        blocks = await conn.fetchval(
+            """
+            WITH leaves AS (
+                SELECT relid FROM pg_partition_tree('events'::regclass) WHERE isleaf
+            )
+            SELECT COALESCE(SUM(pg_prewarm(c.oid)), 0)
+            FROM pg_class c
+            WHERE c.oid IN (SELECT relid FROM leaves)
+                OR c.oid IN (SELECT indexrelid FROM pg_index WHERE indrelid IN (SELECT relid FROM leaves))
+            """
+        )
+    return f"{blocks} blocks"
+
+
+async def _warm_hot_window() -> Optional[str]:
+    return await hot_window.warm(read_connection, event_cache.current_generation())
+
+
+async def _warm_responses() -> str:
+    """Run the common list queries so their bodies (and compressed bodies) are cached."""
+    defaults = _endpoint_defaults(list_events)
+    queries = _warmup_queries()
+    for query in queries:
+        for encoding in ("br", "gzip"):
+            await list_events(**{**defaults, **query, "accept_encoding": encoding})
+    return f"{len(queries)} queries"
+
+
+def _warmup_steps() -> List[warmup.Step]:
+    return [
+        ("pool", _warm_pool),
+        ("relations", _warm_relations),
+        ("hot_window", _warm_hot_window),
+        ("responses", _warm_responses),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Health check — no auth required
+# ---------------------------------------------------------------------------
+
+
+@router.get("/health")
+async def health_check():
+    """Health check endpoint to verify database connectivity."""
+    try:
+        async with db_connection() as conn:
+            await conn.execute("SELECT 1")
+    except Exception as e:
+        raise HTTPException(
+            status_code=503, detail=f"Database connection failed: {str(e)}"
+        )
+    # Not ready until warm, so the first real request is not a cold one.
+    if not warmup.is_warm():
+        raise HTTPException(
+            status_code=503, detail={"status": "warming", "warmup": warmup.stats()}
+        )
+    return {
+        "status": "healthy",
+        "database": "connected",
+        "warmup": warmup.stats(),
+        "hot_window": hot_window.stats(),
+        "pools": db_pools.stats(),
+    }
@@ -0,0 +1,106 @@
+"""Coordinate helpers for the `events.geo` point column (x = longitude, y = latitude)."""
+from __future__ import annotations
+
+import math
+import re
+from typing import Optional
+
+_LATLONG_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+# SQL twin of _LATLONG_RE, used to backfill `geo` from existing strings.
+LATLONG_SQL_PATTERN = r"^\s*-?\d+(\.\d+)?\s*,\s*-?\d+(\.\d+)?\s*$"
+
+
+def parse_latlong(latlong: Optional[str]) -> Optional[tuple[float, float]]:
+    """Turn a `"lat,long"` string into a `(lon, lat)` point, or None if malformed."""
+    if not latlong:
+        return None
+    match = _LATLONG_RE.match(latlong)
+    if not match:
+        return None
+    lat, lon = float(match.group(1)), float(match.group(2))
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return None
+    return (lon, lat)
+
+
+def parse_bbox(value: str) -> Optional[tuple[float, float, float, float]]:
+    """Parse `minLon,minLat,maxLon,maxLat`; None if malformed or inverted."""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(","))
+    except ValueError:
+        return None
+    if min_lon > max_lon or min_lat > max_lat:
+        return None
+    if not (-180.0 <= min_lon and max_lon <= 180.0 and -90.0 <= min_lat and max_lat <= 90.0):
+        return None
+    return (min_lon, min_lat, max_lon, max_lat)
+
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Geohash length stored on every event; clusters group on prefixes of it.
+GEOHASH_PRECISION = 9
+
+
+def geohash_encode(lon: float, lat: float, precision: int = GEOHASH_PRECISION) -> str:
+    lon_range = [-180.0, 180.0]
+    lat_range = [-90.0, 90.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_precision_for_zoom(zoom: int) -> int:
+    """
+    Geohash length whose cells are roughly an eighth of a web-map tile at
+    `zoom`, so a screen holds a few dozen clusters at any zoom level.
+    """
+    thresholds = ((2, 1), (4, 2), (7, 3), (9, 4), (12, 5), (14, 6), (16, 7))
+    for max_zoom, precision in thresholds:
+        if zoom <= max_zoom:
+            return precision
+    return 8
+
+
+EARTH_RADIUS_M = 6371008.8
+
+# Widens the prefilter box so rounding never puts it inside the circle.
+_BBOX_MARGIN = 1.001
+
+
+def radius_bbox(
+    lon: float, lat: float, radius_m: float
+) -> tuple[float, float, float, float]:
+    """
+    Smallest `minLon,minLat,maxLon,maxLat` box containing the circle, on the
+    same sphere (`EARTH_RADIUS_M`) that the /events/nearby haversine uses.
+    """
+    angular = radius_m / EARTH_RADIUS_M * _BBOX_MARGIN
+    dlat = math.degrees(angular)
+    # The circle's widest longitude offset, which lies poleward of `lat`.
+    ratio = math.sin(angular) / max(math.cos(math.radians(lat)), 1e-12)
+    dlon = 180.0 if ratio >= 1 else math.degrees(math.asin(ratio))
+    return (
+        max(lon - dlon, -180.0),
+        max(lat - dlat, -90.0),
+        min(lon + dlon, 180.0),
+        min(lat + dlat, 90.0),
+    )
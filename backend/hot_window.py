@@ -0,0 +1,297 @@
+"""
+Optional in-process copy of the upcoming event window for `/events`.
+
+The next few weeks of events are a few thousand rows that change when a
+scrape or prune runs, yet the frontend asks for them on every load. With
+`HOT_WINDOW_ENABLED=1` the window is loaded into NumPy arrays (day numbers,
+integer codes for source/venue/categories, lat/lon) and `/events` queries
+that fall entirely inside it are answered with vectorized masks instead of
+a database round-trip.
+
+Sort orders are ranked by Postgres at load time so that title and datetime
+ordering follow the database collation exactly. A snapshot is tagged with
+the data generation it was read under; when the generation moves on (or
+the date rolls over) a replacement is built in the background and swapped
+in whole, and queries fall back to Postgres until it is ready.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, List, Optional, Sequence
+
+import asyncpg
+
+# NumPy is optional and only imported once the store is enabled and first
+# loads, so read workers that leave it off do not pay for the import.
+np = None
+
+HOT_WINDOW_ENABLED = os.getenv("HOT_WINDOW_ENABLED", "0").lower() in ("1", "true", "yes")
+HOT_WINDOW_DAYS = int(os.getenv("HOT_WINDOW_DAYS", "45"))
+
+SORTS = ("datetime_desc", "datetime_asc", "title_asc", "title_desc")
+
+# Each rank mirrors the ORDER BY list_events uses for that sort.
+_LOAD_SQL = """
+    SELECT id, title, datetime, venue, venue_id, location, latlong, url, description, categories, source, sources,
+        event_date, geo[0] AS lon, geo[1] AS lat,
+        row_number() OVER (ORDER BY datetime DESC NULLS LAST, id) AS rank_datetime_desc,
+        row_number() OVER (ORDER BY datetime ASC NULLS LAST, id) AS rank_datetime_asc,
+        row_number() OVER (ORDER BY title ASC NULLS LAST, id) AS rank_title_asc,
+        row_number() OVER (ORDER BY title DESC NULLS LAST, id) AS rank_title_desc
+    FROM events
+    WHERE event_date >= $1 AND event_date <= $2
+"""
+
+# ILIKE treats these as pattern syntax; such searches go to Postgres.
+_LIKE_SPECIAL = ("%", "_", "\\")
+
+
+def _intern_codes(values: Sequence[Optional[str]]) -> tuple[Any, List[str], dict]:
+    """Integer code per value (-1 for null) plus the code -> string table."""
+    table: dict[str, int] = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+        else:
+            codes[i] = table.setdefault(sys.intern(value), len(table))
+    return codes, list(table), table
+
+
+def _membership(lists: Sequence[Optional[List[str]]]) -> tuple[dict, Any]:
+    """Value -> column table plus a rows x values boolean matrix for array columns."""
+    table: dict[str, int] = {}
+    row_codes = [
+        [table.setdefault(sys.intern(v), len(table)) for v in values or [] if v is not None]
+        for values in lists
+    ]
+    matrix = np.zeros((len(lists), max(len(table), 1)), dtype=bool)
+    for i, codes in enumerate(row_codes):
+        matrix[i, codes] = True
+    return table, matrix
+
+
+class HotWindow:
+    """An immutable snapshot of every event dated within [start, end]."""
+
+    def __init__(self, rows: Sequence[asyncpg.Record], start: date, end: date, generation: int):
+        self.start = start.isoformat()
+        self.end = end.isoformat()
+        self.loaded_on = start
+        self.generation = generation
+        self.rows = rows
+        n = len(rows)
+
+        self.day = np.fromiter(
+            (row["event_date"].toordinal() for row in rows),
+            dtype=np.int32,
+            count=n,
+        )
+        self.source_table, self.has_source = _membership([r["sources"] for r in rows])
+        self.venue_codes, venues, _ = _intern_codes([r["venue"] for r in rows])
+        self.venues_lower = [v.lower() for v in venues]
+        self.venue_ids = np.fromiter(
+            (-1 if r["venue_id"] is None else r["venue_id"] for r in rows), dtype=np.int64, count=n
+        )
+        self.category_table, self.has_category = _membership([r["categories"] for r in rows])
+
+        # float64 so bbox edges compare exactly like Postgres' float8 points.
+        self.lon = np.array(
+            [np.nan if r["lon"] is None else r["lon"] for r in rows], dtype=np.float64
+        )
+        self.lat = np.array(
+            [np.nan if r["lat"] is None else r["lat"] for r in rows], dtype=np.float64
+        )
+
+        # \x00 keeps a keyword from matching across two fields.
+        self.search_text = [
+            "\x00".join(
+                (r[c] or "").lower()
+                for c in ("title", "venue", "location", "description", "url")
+            )
+            for r in rows
+        ]
+
+        self.orders = {
+            sort: np.argsort(
+                np.fromiter((r[f"rank_{sort}"] for r in rows), dtype=np.int64, count=n),
+                kind="stable",
+            )
+            for sort in SORTS
+        }
+
+    def covers(self, lower: Optional[str], upper: Optional[str]) -> bool:
+        return (
+            lower is not None
+            and upper is not None
+            and lower >= self.start
+            and upper <= self.end
+        )
+
+    def query(
+        self,
+        on_date: Optional[str],
+        source: Optional[str],
+        keyword: Optional[str],
+        category: Optional[str],
+        venue: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        bbox: Optional[tuple[float, float, float, float]],
+        sort: str,
+        limit: int,
+        offset: int,
+        venue_id: Optional[int] = None,
+    ) -> Optional[tuple[List[asyncpg.Record], int]]:
+        """
+        `(page rows, total matches)` with the same semantics as the SQL
+        filters, or None when the query reaches outside the window or uses
+        a pattern this store does not reproduce.
+        """
+        lower = max((d for d in (on_date, start_date) if d is not None), default=None)
+        upper = min((d for d in (on_date, end_date) if d is not None), default=None)
+        if not self.covers(lower, upper) or sort not in self.orders:
+            return None
+        for text in (venue, keyword):
+            if text is not None and (any(ch in text for ch in _LIKE_SPECIAL) or "\x00" in text):
+                return None
+
+        mask = (self.day >= date.fromisoformat(lower).toordinal()) & (
+            self.day <= date.fromisoformat(upper).toordinal()
+        )
+        if source is not None:
+            code = self.source_table.get(source)
+            mask &= False if code is None else self.has_source[:, code]
+        if venue_id is not None:
+            mask &= self.venue_ids == venue_id
+        if category is not None:
+            code = self.category_table.get(category)
+            mask &= False if code is None else self.has_category[:, code]
+        if venue is not None:
+            needle = venue.lower()
+            matches = np.array([needle in v for v in self.venues_lower] + [False], dtype=bool)
+            mask &= matches[self.venue_codes]  # code -1 picks the trailing False
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            mask &= (
+                (self.lon >= min_lon)
+                & (self.lon <= max_lon)
+                & (self.lat >= min_lat)
+                & (self.lat <= max_lat)
+            )
+        if keyword is not None:
+            needle = keyword.lower()
+            mask &= np.fromiter(
+                (needle in text for text in self.search_text), dtype=bool, count=len(self.rows)
+            )
+
+        order = self.orders[sort]
+        selected = order[mask[order]]
+        page = selected[offset : offset + limit]
+        return [self.rows[i] for i in page], int(selected.size)
+
+
+def _import_numpy() -> bool:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+_window: Optional[HotWindow] = None
+_reload_task: Optional[asyncio.Task] = None
+# Generation whose load failed; not retried until the data changes again.
+_failed_generation: Optional[int] = None
+
+
+def current() -> Optional[HotWindow]:
+    return _window
+
+
+def stats() -> dict:
+    window = _window
+    return {
+        "enabled": HOT_WINDOW_ENABLED,
+        "loaded": window is not None,
+        "generation": window.generation if window else None,
+        "start": window.start if window else None,
+        "end": window.end if window else None,
+        "rows": len(window.rows) if window else 0,
+    }
+
+
+async def load(conn: asyncpg.Connection, days: int = HOT_WINDOW_DAYS) -> HotWindow:
+    """Read the window and its generation from one consistent snapshot and swap it in."""
+    global _window
+    start = date.today()
+    end = start + timedelta(days=days - 1)
+    t0 = time.perf_counter()
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        generation = int(await conn.fetchval("SELECT generation FROM data_generation") or 0)
+        rows = await conn.fetch(_LOAD_SQL, start, end)
+    window = HotWindow(rows, start, end, generation)
+    _window = window
+    print(
+        f"🔥 Hot window loaded: {len(rows)} events {window.start}..{window.end} "
+        f"(generation {generation}, {(time.perf_counter() - t0) * 1000:.0f} ms)"
+    )
+    return window
+
+
+def is_fresh(generation: int) -> bool:
+    window = _window
+    return (
+        window is not None
+        and window.generation == generation
+        and window.loaded_on == date.today()
+    )
+
+
+async def warm(connect: Callable, generation: int) -> Optional[str]:
+    """Load the window now, rather than in the background, if enabled and stale."""
+    if not HOT_WINDOW_ENABLED or not _import_numpy() or is_fresh(generation):
+        return None
+    async with connect() as conn:
+        window = await load(conn)
+    return f"{len(window.rows)} events"
+
+
+def refresh_if_stale(connect: Callable, generation: int) -> None:
+    """Start a single background reload if the loaded window is out of date."""
+    global _reload_task
+    if not HOT_WINDOW_ENABLED or not _import_numpy() or is_fresh(generation):
+        return
+    if generation == _failed_generation:
+        return
+    if _reload_task is not None and not _reload_task.done():
+        return
+
+    async def reload() -> None:
+        global _failed_generation
+        try:
+            async with connect() as conn:
+                await load(conn)
+        except Exception as e:
+            _failed_generation = generation
+            print(f"⚠️  Hot window reload failed: {e}")
+
+    _reload_task = asyncio.create_task(reload())
+
+
+async def stop() -> None:
+    global _reload_task
+    if _reload_task is not None:
+        _reload_task.cancel()
+        try:
+            await _reload_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _reload_task = None
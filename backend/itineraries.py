@@ -2,35 +2,15 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Callable, List, Optional
+from typing import Callable, List, Optional
 from uuid import UUID, uuid4
 
 import asyncpg
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from pydantic import BaseModel, Field
 
 from auth import UserOut
-
-
-def _event_row_to_dict(row: Any) -> dict:
-    categories = row.get("categories")
-    category = categories[0] if categories else None
-    datetime_value = row.get("datetime")
-    return {
-        "id": row.get("id"),
-        "title": row.get("title"),
-        "name": row.get("title"),
-        "datetime": datetime_value,
-        "date": datetime_value,
-        "venue": row.get("venue"),
-        "location": row.get("location"),
-        "latlong": row.get("latlong"),
-        "url": row.get("url"),
-        "description": row.get("description"),
-        "categories": categories,
-        "category": category,
-        "source": row.get("source"),
-    }
+from event_json import MAX_EVENT_ID, event_row_to_dict
 
 
 class ItineraryCreateBody(BaseModel):
@@ -42,7 +22,7 @@ class ItineraryUpdateBody(BaseModel):
 
 
 class AddEventBody(BaseModel):
-    event_id: int = Field(ge=1)
+    event_id: int = Field(ge=1, le=MAX_EVENT_ID)
 
 
 class ItinerarySummaryOut(BaseModel):
@@ -88,8 +68,8 @@ async def _build_itinerary_detail(
     event_rows = await conn.fetch(
         """
         SELECT
-            e.id, e.title, e.datetime, e.venue, e.location, e.latlong,
-            e.url, e.description, e.categories, e.source
+            e.id, e.title, e.datetime, e.venue, e.venue_id, e.location, e.latlong,
+            e.url, e.description, e.categories, e.source, e.sources
         FROM itinerary_events ie
         JOIN events e ON e.id = ie.event_id
         WHERE ie.itinerary_id = $1
@@ -103,7 +83,7 @@ async def _build_itinerary_detail(
         eventCount=len(event_rows),
         createdAt=header["created_at"].isoformat(),
         updatedAt=header["updated_at"].isoformat(),
-        events=[_event_row_to_dict(r) for r in event_rows],
+        events=[event_row_to_dict(r) for r in event_rows],
     )
 
 
@@ -258,38 +238,42 @@ def create_itineraries_router(
         user_id = UUID(user.id)
         now = datetime.now(timezone.utc)
         async with get_db_connection() as conn:
-            await _get_owned_itinerary(conn, itinerary_id, user_id)
-            event_exists = await conn.fetchval(
-                "SELECT 1 FROM events WHERE id = $1",
-                body.event_id,
-            )
-            if not event_exists:
-                raise HTTPException(status_code=404, detail="Event not found")
+            async with conn.transaction():
+                await _get_owned_itinerary(conn, itinerary_id, user_id)
+                # There is no foreign key to a partitioned `events`. The row lock
+                # holds off a prune's DETACH of its month until this entry is
+                # committed, so the prune then deletes it with the partition.
+                event_exists = await conn.fetchval(
+                    "SELECT 1 FROM events WHERE id = $1 FOR KEY SHARE",
+                    body.event_id,
+                )
+                if not event_exists:
+                    raise HTTPException(status_code=404, detail="Event not found")
 
-            await conn.execute(
-                """
-                INSERT INTO itinerary_events (itinerary_id, event_id, sort_order, added_at)
-                VALUES ($1, $2, COALESCE(
-                    (SELECT MAX(sort_order) + 1 FROM itinerary_events WHERE itinerary_id = $1),
-                    0
-                ), $3)
-                ON CONFLICT (itinerary_id, event_id) DO NOTHING
-                """,
-                itinerary_id,
-                body.event_id,
-                now,
-            )
-            await conn.execute(
-                "UPDATE itineraries SET updated_at = $1 WHERE id = $2",
-                now,
-                itinerary_id,
-            )
-            return await _build_itinerary_detail(conn, itinerary_id, user_id)
+                await conn.execute(
+                    """
+                    INSERT INTO itinerary_events (itinerary_id, event_id, sort_order, added_at)
+                    VALUES ($1, $2, COALESCE(
+                        (SELECT MAX(sort_order) + 1 FROM itinerary_events WHERE itinerary_id = $1),
+                        0
+                    ), $3)
+                    ON CONFLICT (itinerary_id, event_id) DO NOTHING
+                    """,
+                    itinerary_id,
+                    body.event_id,
+                    now,
+                )
+                await conn.execute(
+                    "UPDATE itineraries SET updated_at = $1 WHERE id = $2",
+                    now,
+                    itinerary_id,
+                )
+                return await _build_itinerary_detail(conn, itinerary_id, user_id)
 
     @router.delete("/itineraries/{itinerary_id}/events/{event_id}", response_model=ItineraryDetailOut)
     async def remove_event(
         itinerary_id: UUID,
-        event_id: int,
+        event_id: int = Path(ge=1, le=MAX_EVENT_ID),
         user: UserOut = Depends(get_current_user),
     ):
         user_id = UUID(user.id)
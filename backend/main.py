@@ -1,48 +1,43 @@
+"""
+Full API: the read app from `main_read` plus scraping, ingest and
+maintenance routes.
+
+    uvicorn main:app
+
+Scraper modules (and bs4/lxml/requests behind them) are imported inside
+the endpoints that use them, so they load on the first scrape rather than
+on every worker start.
+"""
 import asyncio
 import os
-import re
-from contextlib import asynccontextmanager
-from typing import Any, List, Literal, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import List, Optional
 
 import asyncpg
-from data_from_apis.categories import determine_categories
 import httpx
-from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException, Query, Security
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import APIKeyHeader
-from lxml import html
+from fastapi import Depends, HTTPException, Query, Security
 from pydantic import BaseModel
 
-from data_from_apis.data_ticketmaster import (
-    fetch_bay_area_ticketmaster_events,
-    fetch_ticketmaster_events,
+import archive
+import dedupe
+import event_cache
+import partitions
+import query_shapes
+import venues
+from events_api import (
+    TOMBSTONE_RETENTION_DAYS,
+    _api_key_header,
+    db_connection,
+    verify_read_key,
 )
-
-from scraping.scraping_main import (
-    scrape_events_from_warfield,
-    scrape_events_from_funcheap,
-    scrape_events_from_dothebay,
-)
-from data_from_apis.data_resident_advisor import scrape_from_resident_advisor
-from scraping.scraping_city_and_public import scrape_sfrecpark
-from auth import create_auth_router
-from itineraries import create_itineraries_router
-
-load_dotenv()
-
-DATABASE_URL = os.getenv("DATABASE_URL")
+from geo import geohash_encode, parse_latlong
+from main_read import app
+from snapshots import SNAPSHOT_DAYS, build_snapshots
 
 _SCRAPER_API_KEY = os.getenv("SCRAPER_API_KEY")
-_READ_API_KEY = os.getenv("READ_API_KEY")
 
 if not _SCRAPER_API_KEY:
     raise RuntimeError("SCRAPER_API_KEY must be set in environment or .env file")
-if not _READ_API_KEY:
-    raise RuntimeError("READ_API_KEY must be set in environment or .env file")
-
-_api_key_header = APIKeyHeader(name="X-API-Key", auto_error=True)
 
 
 async def verify_scraper_key(key: str = Security(_api_key_header)) -> None:
@@ -50,48 +45,9 @@ async def verify_scraper_key(key: str = Security(_api_key_header)) -> None:
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
 
 
-async def verify_read_key(key: str = Security(_api_key_header)) -> None:
-    if key != _READ_API_KEY:
-        raise HTTPException(status_code=401, detail="Invalid or missing API key")
-
-
 # In-memory cache for geocoded locations to avoid redundant API calls
 _geocode_cache: dict = {}
 
-# Connection pool for query endpoints (created on startup).
-db_pool: Optional[asyncpg.Pool] = None
-
-
-def _get_connect_kwargs() -> dict:
-    """Add SSL for Neon/remote connections, skip for local."""
-    url = DATABASE_URL or ""
-    if "neon.tech" in url or "sslmode=require" in url:
-        return {"ssl": "require"}
-    return {}
-
-
-@asynccontextmanager
-async def db_connection():
-    """
-    Yields an asyncpg connection from the pool when available; otherwise,
-    falls back to a one-off connection.
-    """
-    global db_pool
-
-    if not DATABASE_URL:
-        raise RuntimeError("DATABASE_URL must be set in environment or .env file")
-
-    if db_pool is not None:
-        async with db_pool.acquire() as conn:
-            yield conn
-        return
-
-    conn = await asyncpg.connect(DATABASE_URL, **_get_connect_kwargs())
-    try:
-        yield conn
-    finally:
-        await conn.close()
-
 
 async def geocode_location(location: str) -> Optional[str]:
     """
@@ -134,21 +90,6 @@ async def geocode_location(location: str) -> Optional[str]:
     return None
 
 
-app = FastAPI(title="Events Scraper API", version="1.0.0")
-
-_cors_origins = os.getenv(
-    "CORS_ORIGINS",
-    "http://localhost:5173,http://127.0.0.1:5173",
-).split(",")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[o.strip() for o in _cors_origins if o.strip()],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
 class ScrapeRequest(BaseModel):
     url: Optional[str] = None
     source: Optional[str] = None
@@ -167,198 +108,40 @@ class Event(BaseModel):
     source: Optional[str] = None
 
 
-class EventOut(BaseModel):
-    """
-    Response shape tailored for the existing frontend components.
-
-    The DB uses `datetime` and `categories`, but the UI expects:
-    - `date` (string) and `category` (string)
-    - `name` as a fallback for `title`
-    """
-
-    id: int
-    title: str
-    name: Optional[str] = None
-    datetime: Optional[str] = None
-    date: Optional[str] = None
-    venue: Optional[str] = None
-    location: Optional[str] = None
-    latlong: Optional[str] = None
-    url: Optional[str] = None
-    description: Optional[str] = None
-    categories: Optional[List[str]] = None
-    category: Optional[str] = None
-    source: Optional[str] = None
-
-
-_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-
-
-def _validate_iso_date(value: str, param_name: str) -> str:
-    if not _ISO_DATE_RE.fullmatch(value):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid `{param_name}`. Expected YYYY-MM-DD.",
-        )
-    return value
-
-
-def _event_row_to_out(row: Any) -> dict:
-    categories = row.get("categories")
-    category = categories[0] if categories else None
-    datetime_value = row.get("datetime")
-
-    # Frontend expects `name`, `date`, and `category`.
-    return {
-        "id": row.get("id"),
-        "title": row.get("title"),
-        "name": row.get("title"),
-        "datetime": datetime_value,
-        "date": datetime_value,
-        "venue": row.get("venue"),
-        "location": row.get("location"),
-        "latlong": row.get("latlong"),
-        "url": row.get("url"),
-        "description": row.get("description"),
-        "categories": categories,
-        "category": category,
-        "source": row.get("source"),
-    }
-
-
-async def init_db():
-    if not DATABASE_URL:
-        raise RuntimeError("DATABASE_URL must be set in environment or .env file")
-
-    try:
-        conn = await asyncpg.connect(DATABASE_URL, **_get_connect_kwargs())
-    except asyncpg.exceptions.InvalidCatalogNameError as e:
-        import re
-
-        db_match = re.search(r'database "([^"]+)"', str(e))
-        db_name = db_match.group(1) if db_match else "unknown"
-        raise RuntimeError(
-            f'Database "{db_name}" does not exist. '
-            f"Please create it first:\n"
-            f'  psql postgres -c "CREATE DATABASE \\"{db_name}\\";"\n'
-            f"Or run: ./create_database.sh"
-        ) from e
-    except Exception as e:
-        raise RuntimeError(
-            f"Failed to connect to database: {str(e)}\n"
-            f"Make sure PostgreSQL is running and DATABASE_URL is correct."
-        ) from e
-
-    try:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS events (
-                id SERIAL PRIMARY KEY,
-                title TEXT NOT NULL,
-                datetime TEXT,
-                venue TEXT,
-                location TEXT,
-                latlong TEXT,
-                url TEXT,
-                description TEXT,
-                categories TEXT[],
-                source TEXT             
-            )
-            """)
-
-        await conn.execute("""
-            DO $$ 
-            BEGIN 
-                IF NOT EXISTS (
-                    SELECT 1 FROM information_schema.columns 
-                    WHERE table_name='events' AND column_name='datetime'
-                ) THEN
-                    ALTER TABLE events ADD COLUMN datetime TEXT;
-                END IF;
-            END $$;
-            """)
-
-        await conn.execute("""
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_events_title ON events (title, datetime, venue);
-             """)
-
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id UUID PRIMARY KEY,
-                email TEXT NOT NULL UNIQUE,
-                password_hash TEXT NOT NULL,
-                display_name TEXT NOT NULL,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-            )
-            """)
-
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS refresh_tokens (
-                id UUID PRIMARY KEY,
-                user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                token_hash TEXT NOT NULL UNIQUE,
-                expires_at TIMESTAMPTZ NOT NULL,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-            )
-            """)
-
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user
-            ON refresh_tokens (user_id)
-            """)
-
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS itineraries (
-                id UUID PRIMARY KEY,
-                user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                name TEXT NOT NULL,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-            )
-            """)
-
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS itinerary_events (
-                itinerary_id UUID NOT NULL REFERENCES itineraries(id) ON DELETE CASCADE,
-                event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
-                sort_order INTEGER NOT NULL DEFAULT 0,
-                added_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                PRIMARY KEY (itinerary_id, event_id)
-            )
-            """)
-
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_itineraries_user
-            ON itineraries (user_id)
-            """)
-    finally:
-        await conn.close()
-
-
-_auth_router, get_current_user = create_auth_router(db_connection)
-app.include_router(_auth_router)
-app.include_router(create_itineraries_router(db_connection, get_current_user))
-
-
-@app.on_event("startup")
-async def startup_event():
-    await init_db()
-    global db_pool
-    db_pool = await asyncpg.create_pool(
-        DATABASE_URL, min_size=1, max_size=10, **_get_connect_kwargs()
-    )
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    global db_pool
-    if db_pool is not None:
-        await db_pool.close()
-        db_pool = None
+# Order-preserving union of two arrays, used for `sources` and `categories`.
+_ARRAY_UNION_SQL = """ARRAY(
+    SELECT c FROM unnest({0} || {1}) WITH ORDINALITY AS t(c, n)
+    GROUP BY c ORDER BY MIN(n)
+)"""
+
+_MERGE_DUPLICATE_SQL = f"""
+    UPDATE events SET
+        sources = {_ARRAY_UNION_SQL.format("COALESCE(sources, '{}')", "$2::text[]")},
+        categories = {_ARRAY_UNION_SQL.format("COALESCE(categories, '{}')", "$3::text[]")},
+        source_categories = {_ARRAY_UNION_SQL.format("COALESCE(source_categories, '{}')", "$9::text[]")},
+        latlong = COALESCE(latlong, $4::text),
+        geo = CASE WHEN latlong IS NULL THEN $5::point ELSE geo END,
+        geohash = CASE WHEN latlong IS NULL THEN $6::text ELSE geohash END,
+        description = COALESCE(NULLIF(description, ''), $7::text),
+        url = COALESCE(url, $8::text),
+        updated_at = NOW(),
+        change_seq = next_change_seq()
+    WHERE id = $1
+        AND (NOT ($2::text[] <@ COALESCE(sources, '{{}}'))
+            OR NOT ($3::text[] <@ COALESCE(categories, '{{}}'))
+            OR NOT ($9::text[] <@ COALESCE(source_categories, '{{}}'))
+            OR (latlong IS NULL AND $4::text IS NOT NULL)
+            OR (COALESCE(description, '') = '' AND COALESCE($7::text, '') <> ''))
+    RETURNING id
+"""
 
 
 async def populate_database(events: List[dict]):
-    conn = await asyncpg.connect(DATABASE_URL, **_get_connect_kwargs())
+    from data_from_apis.categories import classify_events
+
     inserted_count = 0
+    updated_count = 0
+    merged_count = 0
     skipped_count = 0
     geocode_count = 0
     source_names = sorted(
@@ -367,33 +150,111 @@ async def populate_database(events: List[dict]):
         if isinstance(source, str) and source
     )
 
-    try:
+    async def geocode(location: str) -> Optional[str]:
+        nonlocal geocode_count
+        geocode_count += 1
+        return await geocode_location(location)
+
+    # The write pool keeps a long ingest from starving read and auth traffic.
+    async with db_connection("write") as conn:
         print(
             f"💾 Populating database with {len(events)} events"
             f" from {', '.join(source_names) if source_names else 'unknown sources'}"
         )
-        for event in events:
+        # Stored events on the batch's days, for matching the same event
+        # listed by another source under a slightly different title/venue.
+        event_dates = [partitions.event_date(e.get("datetime")) for e in events]
+        index = await dedupe.load_index(conn, (d for d in event_dates if d is not None))
+        # Months past the prepared ones (or already pruned) get their partition now.
+        await partitions.ensure_partitions(conn, event_dates)
+        # One classifier pass over the whole batch.
+        batch_categories = classify_events(events)
+        for event, categories, event_date in zip(events, batch_categories, event_dates):
             try:
-                if not event.get("latlong") and event.get("location"):
-                    geocode_count += 1
-                    event["latlong"] = await geocode_location(event["location"])
-
-                categories = determine_categories(
+                sources = [event["source"]] if event.get("source") else []
+                # Kept as supplied so recategorize.py can rerun the rules.
+                source_categories = [
+                    label.lower() for label in event.get("categories") or [] if isinstance(label, str)
+                ]
+                point = parse_latlong(event.get("latlong"))
+                candidate = dedupe.make_candidate(
+                    None,
                     event.get("title"),
-                    event.get("description"),
+                    event.get("datetime"),
                     event.get("venue"),
-                    event.get("categories"),
+                    geohash_encode(*point) if point else None,
+                    sources,
                 )
-                categories = [category.lower() for category in categories]
+                # Match on the venue block first so a duplicate never pays
+                # for a venue lookup or geocode, then retry on the geocell
+                # once we have coordinates.
+                match_id = index.find(candidate) if candidate else None
+                venue = None
+                if match_id is None:
+                    venue = await venues.resolve(
+                        conn,
+                        event.get("venue"),
+                        event.get("location"),
+                        event.get("latlong"),
+                        geocode,
+                    )
+                    if venue is not None:
+                        # Known venues carry their coordinates (`resolve` geocodes one
+                        # that has none), so the event needs no geocode of its own.
+                        event["location"] = event.get("location") or venue.location
+                        if not point and venue.latlong:
+                            event["latlong"] = venue.latlong
+                    elif not point and event.get("location"):
+                        event["latlong"] = await geocode(event["location"])
+                    if not point:
+                        point = parse_latlong(event.get("latlong"))
+                        if candidate and point:
+                            candidate.geocell = geohash_encode(*point)[: dedupe.GEOCELL_PRECISION]
+                            match_id = index.find(candidate)
+                geohash = geohash_encode(*point) if point else None
+
+                if match_id is not None:
+                    merged = await conn.fetchval(
+                        _MERGE_DUPLICATE_SQL,
+                        match_id,
+                        sources,
+                        categories,
+                        event.get("latlong") if point else None,
+                        point,
+                        geohash,
+                        event.get("description"),
+                        event.get("url"),
+                        source_categories,
+                    )
+                    if merged is None:
+                        skipped_count += 1
+                    else:
+                        merged_count += 1
+                    # Another similar listing from this source in the batch is a new row.
+                    index.add_sources(match_id, sources)
+                    continue
+
                 row = await conn.fetchrow(
-                    """
-                    INSERT INTO events (title, datetime, venue, location, latlong, url, description, categories, source)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                    ON CONFLICT (title, datetime, venue) 
+                    f"""
+                    INSERT INTO events (title, datetime, venue, location, latlong, url, description, categories, source, geo, geohash, sources, venue_id, source_categories, event_date)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+                    ON CONFLICT (title, datetime, venue, event_date)
                     DO UPDATE SET
-                        categories = EXCLUDED.categories || events.categories,
-                        latlong = COALESCE(events.latlong, EXCLUDED.latlong)
-                    RETURNING (xmax = 0) AS inserted
+                        categories = {_ARRAY_UNION_SQL.format("EXCLUDED.categories", "events.categories")},
+                        source_categories = {_ARRAY_UNION_SQL.format("COALESCE(events.source_categories, '{}')", "EXCLUDED.source_categories")},
+                        sources = {_ARRAY_UNION_SQL.format("COALESCE(events.sources, '{}')", "EXCLUDED.sources")},
+                        latlong = COALESCE(events.latlong, EXCLUDED.latlong),
+                        geo = CASE WHEN events.latlong IS NULL THEN EXCLUDED.geo ELSE events.geo END,
+                        geohash = CASE WHEN events.latlong IS NULL THEN EXCLUDED.geohash ELSE events.geohash END,
+                        venue_id = COALESCE(events.venue_id, EXCLUDED.venue_id),
+                        updated_at = NOW(),
+                        change_seq = next_change_seq()
+                    WHERE NOT (EXCLUDED.categories <@ COALESCE(events.categories, '{{}}'))
+                        OR NOT (EXCLUDED.sources <@ COALESCE(events.sources, '{{}}'))
+                        OR NOT (EXCLUDED.source_categories <@ COALESCE(events.source_categories, '{{}}'))
+                        OR (events.latlong IS NULL AND EXCLUDED.latlong IS NOT NULL)
+                        OR (events.venue_id IS NULL AND EXCLUDED.venue_id IS NOT NULL)
+                    RETURNING id, (created_at = NOW()) AS inserted
                     """,
                     event.get("title"),
                     event.get("datetime"),
@@ -404,20 +265,36 @@ async def populate_database(events: List[dict]):
                     event.get("description"),
                     categories,
                     event.get("source"),
+                    point,
+                    geohash,
+                    sources or None,
+                    venue.id if venue else None,
+                    source_categories,
+                    event_date,
                 )
-                if row["inserted"]:
+                # No row back means the conflict update changed nothing. Each
+                # statement commits on its own, so only a row inserted by this
+                # one has created_at = NOW() (xmax is not available on a
+                # partitioned table).
+                if row is None:
+                    skipped_count += 1
+                elif row["inserted"]:
                     inserted_count += 1
+                    if candidate:
+                        candidate.id = row["id"]
+                        index.add(candidate)
                 else:
-                    skipped_count += 1
+                    updated_count += 1
 
             except Exception as e:
                 continue
 
+        if inserted_count or updated_count or merged_count:
+            await event_cache.bump_generation(conn)
+
         print(
-            f"\n📊 Database summary: {inserted_count} inserted, {skipped_count} duplicates skipped, {geocode_count} geocoded"
+            f"\n📊 Database summary: {inserted_count} inserted, {updated_count} updated, {merged_count} merged across sources, {skipped_count} duplicates skipped, {geocode_count} geocoded"
         )
-    finally:
-        await conn.close()
 
 
 # ---------------------------------------------------------------------------
@@ -431,6 +308,8 @@ async def populate_database(events: List[dict]):
     dependencies=[Depends(verify_scraper_key)],
 )
 async def scrape_events_warfield():
+    from scraping.scraping_main import scrape_events_from_warfield
+
     response = await scrape_events_from_warfield()
     await populate_database(response)
     return response
@@ -442,6 +321,8 @@ async def scrape_events_warfield():
     dependencies=[Depends(verify_scraper_key)],
 )
 async def scrape_events_funcheap():
+    from scraping.scraping_main import scrape_events_from_funcheap
+
     response = await scrape_events_from_funcheap()
     # await populate_database(response)
     return response
@@ -453,6 +334,8 @@ async def scrape_events_funcheap():
     dependencies=[Depends(verify_scraper_key)],
 )
 async def scrape_events_dothebay():
+    from scraping.scraping_main import scrape_events_from_dothebay
+
     response = await scrape_events_from_dothebay()
     await populate_database(response)
     return response
@@ -464,6 +347,8 @@ async def scrape_events_dothebay():
     dependencies=[Depends(verify_scraper_key)],
 )
 async def scrape_events_sfrecpark():
+    from scraping.scraping_city_and_public import scrape_sfrecpark
+
     response = await scrape_sfrecpark()
     await populate_database(response)
     return response
@@ -475,6 +360,8 @@ async def scrape_events_sfrecpark():
     dependencies=[Depends(verify_scraper_key)],
 )
 async def scrape_events_resident_advisor():
+    from data_from_apis.data_resident_advisor import scrape_from_resident_advisor
+
     response = await scrape_from_resident_advisor()
     await populate_database(response)
     return response
@@ -486,6 +373,8 @@ async def get_ticketmaster_events(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
 ):
+    from data_from_apis.data_ticketmaster import fetch_bay_area_ticketmaster_events
+
     if start_date is None:
         start_date = (datetime.now()).strftime("%Y-%m-%dT00:00:00Z")
     if end_date is None:
@@ -508,251 +397,104 @@ async def get_ticketmaster_events(
         )
 
 
-# ---------------------------------------------------------------------------
-# Read endpoints — protected by READ_API_KEY
-# ---------------------------------------------------------------------------
-
-
-@app.delete(
-    "/events/prune_old",
-    dependencies=[Depends(verify_read_key)],
-)
-async def prune_old_events():
-    cutoff_date = (datetime.now() - timedelta(days=14)).strftime("%Y-%m-%dT%H:%M:%SZ")
-    async with db_connection() as conn:
-        result = await conn.execute(
-            """
-            DELETE FROM events
-            WHERE datetime IS NOT NULL AND datetime < $1
-            """,
-            cutoff_date,
-        )
-    deleted_count = int(result.split(" ")[-1])  # e.g. "DELETE 5"
-    return {"deleted": deleted_count, "cutoff_date": cutoff_date}
-
-
-@app.get(
-    "/events",
-    response_model=List[EventOut],
-    dependencies=[Depends(verify_read_key)],
-)
-async def list_events(
-    on_date: Optional[str] = Query(
-        default=None, description="Filter by date (YYYY-MM-DD)"
-    ),
-    source: Optional[str] = Query(default=None, description="Filter by exact source"),
-    keyword: Optional[str] = Query(
-        default=None, description="Search in title/venue/location/description/url"
-    ),
-    category: Optional[str] = Query(
-        default=None, description="Filter by category (exact match within categories[])"
-    ),
-    venue: Optional[str] = Query(
-        default=None, description="Filter by venue (case-insensitive substring)"
-    ),
-    start_date: Optional[str] = Query(
-        default=None, description="Filter start (YYYY-MM-DD)"
-    ),
-    end_date: Optional[str] = Query(
-        default=None, description="Filter end (YYYY-MM-DD)"
-    ),
-    limit: int = Query(default=100, ge=1, le=1000, description="Max events to return"),
-    offset: int = Query(default=0, ge=0, description="Pagination offset"),
-    sort: str = Query(
-        default="datetime_desc",
-        description="Sort: datetime_desc | datetime_asc | title_asc | title_desc",
+@app.post("/build_snapshots", dependencies=[Depends(verify_scraper_key)])
+async def build_event_snapshots(
+    days: int = Query(
+        default=SNAPSHOT_DAYS, ge=1, le=120, description="Days to snapshot from today"
     ),
 ):
-    if on_date is not None:
-        on_date = _validate_iso_date(on_date, "on_date")
-    if start_date is not None:
-        start_date = _validate_iso_date(start_date, "start_date")
-    if end_date is not None:
-        end_date = _validate_iso_date(end_date, "end_date")
-
-    allowed_sorts = {
-        "datetime_desc": "datetime DESC NULLS LAST",
-        "datetime_asc": "datetime ASC NULLS LAST",
-        "title_asc": "title ASC NULLS LAST",
-        "title_desc": "title DESC NULLS LAST",
-    }
-    if sort not in allowed_sorts:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid `sort`. Allowed: {', '.join(sorted(allowed_sorts.keys()))}",
-        )
-
-    where_clauses: List[str] = []
-    args: List[Any] = []
-
-    def add_arg(condition_template: str, value: Any) -> None:
-        param_idx = len(args) + 1
-        where_clauses.append(condition_template.format(param=f"${param_idx}"))
-        args.append(value)
-
-    if on_date is not None:
-        add_arg("(datetime IS NOT NULL AND LEFT(datetime, 10) = {param})", on_date)
-
-    if start_date is not None:
-        add_arg("(datetime IS NOT NULL AND LEFT(datetime, 10) >= {param})", start_date)
-    if end_date is not None:
-        add_arg("(datetime IS NOT NULL AND LEFT(datetime, 10) <= {param})", end_date)
-
-    if source is not None:
-        add_arg("source = {param}", source)
-
-    if venue is not None:
-        add_arg("(venue ILIKE {param})", f"%{venue}%")
-
-    if keyword is not None:
-        kw = f"%{keyword}%"
-        where_clauses.append(
-            "("
-            "title ILIKE {param} OR "
-            "venue ILIKE {param} OR "
-            "location ILIKE {param} OR "
-            "description ILIKE {param} OR "
-            "url ILIKE {param}"
-            ")".format(param="{param}")
-        )
-        param_idx = len(args) + 1
-        where_clauses[-1] = where_clauses[-1].format(param=f"${param_idx}")
-        args.append(kw)
-
-    if category is not None:
-        add_arg("{param} = ANY(categories)", category)
-
-    where_sql = " AND ".join(where_clauses) if where_clauses else "TRUE"
-    order_by_sql = allowed_sorts[sort]
-
-    select_columns = """
-        id,
-        title,
-        datetime,
-        venue,
-        location,
-        latlong,
-        url,
-        description,
-        categories,
-        source
-    """
-
-    base_from = f"FROM events WHERE {where_sql}"
-
+    """Post-scrape stage: rewrite the static per-day snapshots served at /snapshots."""
     async with db_connection() as conn:
-        total_query = f"SELECT COUNT(*) {base_from}"
-        total_count = await conn.fetchval(total_query, *args)
-
-        limit_param = len(args) + 1
-        offset_param = len(args) + 2
-        events_query = (
-            f"SELECT {select_columns} {base_from} "
-            f"ORDER BY {order_by_sql} "
-            f"LIMIT ${limit_param} OFFSET ${offset_param}"
+        manifest = await build_snapshots(
+            conn, days=days, generation=event_cache.current_generation()
         )
-        rows = await conn.fetch(events_query, *args, limit, offset)
-
-    _ = total_count
-    return [_event_row_to_out(r) for r in rows]
+    return {
+        "start": manifest["start"],
+        "end": manifest["end"],
+        "events": sum(day["count"] for day in manifest["days"].values()),
+    }
 
 
-@app.get(
-    "/api/events",
-    response_model=List[EventOut],
-    include_in_schema=False,
-    dependencies=[Depends(verify_read_key)],
-)
-async def list_events_api(
-    on_date: Optional[str] = Query(
-        default=None, description="Filter by date (YYYY-MM-DD)"
-    ),
-    source: Optional[str] = Query(default=None, description="Filter by exact source"),
-    keyword: Optional[str] = Query(
-        default=None, description="Search in title/venue/location/description/url"
-    ),
-    category: Optional[str] = Query(
-        default=None, description="Filter by category (exact match within categories[])"
-    ),
-    venue: Optional[str] = Query(
-        default=None, description="Filter by venue (case-insensitive substring)"
-    ),
-    start_date: Optional[str] = Query(
-        default=None, description="Filter start (YYYY-MM-DD)"
-    ),
-    end_date: Optional[str] = Query(
-        default=None, description="Filter end (YYYY-MM-DD)"
-    ),
-    limit: int = Query(default=100, ge=1, le=1000, description="Max events to return"),
-    offset: int = Query(default=0, ge=0, description="Pagination offset"),
-    sort: str = Query(
-        default="datetime_desc",
-        description="Sort: datetime_desc | datetime_asc | title_asc | title_desc",
-    ),
-):
-    return await list_events(
-        on_date=on_date,
-        source=source,
-        keyword=keyword,
-        category=category,
-        venue=venue,
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit,
-        offset=offset,
-        sort=sort,
-    )
+# ---------------------------------------------------------------------------
+# Maintenance endpoints
+# ---------------------------------------------------------------------------
 
 
-@app.get(
-    "/events/{event_id}",
-    response_model=EventOut,
-    dependencies=[Depends(verify_read_key)],
-)
-async def get_event(event_id: int):
-    async with db_connection() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT
-                id, title, datetime, venue, location, latlong, url, description, categories, source
-            FROM events
-            WHERE id = $1
-            """,
-            event_id,
+async def _expire_tombstones(conn: asyncpg.Connection) -> None:
+    """Drop old tombstones and remember the newest one dropped as the sync horizon."""
+    await conn.execute(
+        """
+        WITH expired AS (
+            DELETE FROM event_tombstones
+            WHERE deleted_at < NOW() - make_interval(days => $1)
+            RETURNING change_seq
+        )
+        UPDATE data_generation
+        SET tombstone_horizon = GREATEST(
+            tombstone_horizon, (SELECT MAX(change_seq) FROM expired)
         )
+        WHERE EXISTS (SELECT 1 FROM expired)
+        """,
+        TOMBSTONE_RETENTION_DAYS,
+    )
 
-    if row is None:
-        raise HTTPException(status_code=404, detail="Event not found")
 
-    return _event_row_to_out(row)
+# I want a function to prune everything older than 2 weeks from the database, to keep it clean and relevant. This can be run as a scheduled task.
 
 
-@app.get(
-    "/api/events/{event_id}",
-    response_model=EventOut,
-    include_in_schema=False,
+@app.delete(
+    "/events/prune_old",
     dependencies=[Depends(verify_read_key)],
 )
-async def get_event_api(event_id: int):
-    return await get_event(event_id)
+async def prune_old_events():
+    """
+    Drop the partitions of months that ended more than two weeks ago,
+    archiving their rows to Parquet first when EVENTS_ARCHIVE_DIR is set.
 
+    Pruning is by whole month, so an event stays until its month's
+    partition expires (at most about six weeks). Undated events are kept.
+    """
+    if archive.enabled() and not archive.available():
+        # Never drop history that was meant to be archived.
+        raise HTTPException(
+            status_code=503, detail="EVENTS_ARCHIVE_DIR is set but pyarrow is not installed"
+        )
+    cutoff = date.today() - timedelta(days=14)
+    async with db_connection() as conn:
+        dropped, deleted_count, archived = await partitions.drop_expired(
+            conn, cutoff, archive.archive_partition if archive.enabled() else None
+        )
+        await partitions.ensure_upcoming(conn)
+        async with conn.transaction():
+            await _expire_tombstones(conn)
+        if deleted_count:
+            await event_cache.bump_generation(conn)
+    return {
+        "deleted": deleted_count,
+        "cutoff_date": cutoff.isoformat(),
+        "dropped_partitions": dropped,
+        "archived_files": archived,
+    }
 
-# I want a function to prune everything older than 2 weeks from the database, to keep it clean and relevant. This can be run as a scheduled task.
 
+@app.post("/events/recategorize", dependencies=[Depends(verify_scraper_key)])
+async def recategorize_events(
+    dry_run: bool = Query(default=False, description="Count changes without writing"),
+    restart: bool = Query(default=False, description="Ignore a saved checkpoint"),
+):
+    """Rerun the category rules over every stored event (see recategorize.py)."""
+    from recategorize import recategorize
 
-# ---------------------------------------------------------------------------
-# Health check — no auth required
-# ---------------------------------------------------------------------------
+    return await recategorize(restart=restart, dry_run=dry_run)
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint to verify database connectivity."""
-    try:
-        async with db_connection() as conn:
-            await conn.execute("SELECT 1")
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        raise HTTPException(
-            status_code=503, detail=f"Database connection failed: {str(e)}"
-        )
+@app.get("/stats/query_shapes", dependencies=[Depends(verify_scraper_key)])
+async def query_shape_stats():
+    """
+    Wall time per canonical query shape in this worker, with sampled
+    server-side planning vs execution time.
+    """
+    return {
+        "statement_cache_size": query_shapes.STATEMENT_CACHE_SIZE,
+        "shapes": query_shapes.snapshot(),
+    }
@@ -0,0 +1,72 @@
+"""
+Read-only ASGI entry point: events, auth and itineraries.
+
+    uvicorn main_read:app
+
+Imports none of the scraper or ingest code, so a cold worker is up sooner
+than with `main:app`, which is this app plus the scraping, ingest and
+maintenance routes.
+"""
+import os
+from functools import partial
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+import events_api
+from auth import create_auth_router
+from itineraries import create_itineraries_router
+
+app = FastAPI(title="Events Scraper API", version="1.0.0")
+
+_cors_origins = os.getenv(
+    "CORS_ORIGINS",
+    "http://localhost:5173,http://127.0.0.1:5173",
+).split(",")
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[o.strip() for o in _cors_origins if o.strip()],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count"],
+)
+
+app.include_router(events_api.router)
+# Only processes that archive pruned months (EVENTS_ARCHIVE_DIR) load the
+# archive module and serve /archive/events.
+if os.getenv("EVENTS_ARCHIVE_DIR"):
+    import archive
+
+    app.include_router(archive.router)
+
+_auth_router, get_current_user = create_auth_router(
+    partial(events_api.db_connection, "auth")
+)
+app.include_router(_auth_router)
+app.include_router(
+    create_itineraries_router(partial(events_api.db_connection, "auth"), get_current_user)
+)
+
+# Day snapshots written by /build_snapshots are served by a static server
+# or CDN; SNAPSHOT_SERVE_FROM_API=1 serves them from here instead, behind
+# the read key.
+if os.getenv("SNAPSHOT_SERVE_FROM_API", "0").lower() in ("1", "true", "yes"):
+    from snapshots import SNAPSHOT_DIR, SnapshotFiles
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    app.mount(
+        "/snapshots",
+        SnapshotFiles(directory=SNAPSHOT_DIR, verify_key=events_api.verify_read_key),
+        name="snapshots",
+    )
+
+
+@app.on_event("startup")
+async def startup_event():
+    await events_api.startup()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await events_api.shutdown()
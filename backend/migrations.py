@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations.
+
+Each migration is an ordered list of steps (SQL strings, or async callables
+for backfills that need Python), recorded in `schema_migrations` with a
+checksum of its steps. A run applies everything pending in one
+transaction under an advisory lock, so concurrent deploys cannot
+interleave. The API only checks that the database is at `LATEST_VERSION`
+on startup; migrations run from this script:
+
+    python migrations.py            # apply pending migrations
+    python migrations.py status     # show applied / pending versions
+
+Migrations 1-5 reproduce the DDL `init_db` used to run on every start. It
+was written with IF NOT EXISTS throughout, so databases created that way
+are brought under version control by simply applying them.
+
+Migration 9 drops the `itinerary_events.event_id` foreign key: a
+partitioned `events` can only be referenced on its full unique key
+`(id, event_date)`. Its guarantees are kept in code instead. Adding an
+event to an itinerary takes `FOR KEY SHARE` on the event row in the same
+transaction, so a prune cannot detach that month until the entry is
+committed, and the prune deletes the entries of every partition it drops.
+
+Never edit a migration that has shipped; add a new one.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import os
+import sys
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Union
+
+import asyncpg
+from dotenv import load_dotenv
+
+from db_pools import connect_kwargs_for
+from geo import LATLONG_SQL_PATTERN, geohash_encode, parse_latlong
+
+Step = Union[str, Callable[[asyncpg.Connection], Awaitable[None]]]
+
+# Serializes concurrent `migrate` runs (e.g. two deploys at once).
+_ADVISORY_LOCK_ID = 0x5F0E_0001
+
+# Held shared by every transaction that claims an `event_change_seq`
+# value (via `next_change_seq()`, migration 10) and exclusively by
+# /events/changes while it reads the sync token.
+CHANGE_SEQ_LOCK_ID = 0x5F0E_0002
+
+
+# Write-side modules the backfill steps use, imported by `migrate` on first
+# use so the API's startup version check does not load them.
+partitions = venue_key = None
+
+
+def _import_step_modules() -> None:
+    global partitions, venue_key
+    if partitions is None:
+        import partitions as partitions_module
+        from venues import venue_key as venue_key_function
+
+        partitions, venue_key = partitions_module, venue_key_function
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    steps: tuple[Step, ...]
+
+    @property
+    def checksum(self) -> str:
+        digest = hashlib.sha256()
+        for step in self.steps:
+            text = step if isinstance(step, str) else inspect.getsource(step)
+            digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+
+async def _backfill_geo(conn: asyncpg.Connection) -> None:
+    await conn.execute(
+        """
+        UPDATE events
+        SET geo = point(
+            TRIM(split_part(latlong, ',', 2))::float8,
+            TRIM(split_part(latlong, ',', 1))::float8
+        )
+        WHERE geo IS NULL AND latlong ~ $1
+        """,
+        LATLONG_SQL_PATTERN,
+    )
+
+
+async def _backfill_geohash(conn: asyncpg.Connection) -> None:
+    missing = await conn.fetch(
+        "SELECT id, geo FROM events WHERE geohash IS NULL AND geo IS NOT NULL"
+    )
+    if missing:
+        await conn.executemany(
+            "UPDATE events SET geohash = $2 WHERE id = $1",
+            [(r["id"], geohash_encode(r["geo"].x, r["geo"].y)) for r in missing],
+        )
+
+
+async def _backfill_venues(conn: asyncpg.Connection) -> None:
+    # Most-listed spelling first, so it becomes the venue's display name.
+    spellings = await conn.fetch(
+        """
+        SELECT venue, MIN(location) AS location, MIN(latlong) AS latlong, COUNT(*) AS n
+        FROM events
+        WHERE venue IS NOT NULL AND venue_id IS NULL
+        GROUP BY venue
+        ORDER BY n DESC, venue
+        """
+    )
+    venues: dict[str, dict] = {}
+    venue_for_spelling: dict[str, str] = {}
+    for row in spellings:
+        key = venue_key(row["venue"])
+        if key is None:
+            continue
+        venue = venues.setdefault(
+            key, {"name": row["venue"].split(",")[0].strip(), "location": None, "latlong": None}
+        )
+        venue["location"] = venue["location"] or row["location"]
+        if venue["latlong"] is None and parse_latlong(row["latlong"]):
+            venue["latlong"] = row["latlong"]
+        venue_for_spelling[row["venue"]] = key
+
+    venue_ids: dict[str, int] = {}
+    for key, venue in venues.items():
+        point = parse_latlong(venue["latlong"])
+        venue_ids[key] = await conn.fetchval(
+            """
+            INSERT INTO venues (name, location, latlong, geo, geohash)
+            VALUES ($1, $2, $3, $4, $5)
+            RETURNING id
+            """,
+            venue["name"],
+            venue["location"],
+            venue["latlong"],
+            point,
+            geohash_encode(*point) if point else None,
+        )
+    await conn.executemany(
+        "INSERT INTO venue_aliases (alias_key, venue_id, alias) VALUES ($1, $2, $3)",
+        [(key, venue_ids[key], venue["name"]) for key, venue in venues.items()],
+    )
+    await conn.execute(
+        """
+        UPDATE events e SET venue_id = m.venue_id
+        FROM unnest($1::text[], $2::int[]) AS m(venue, venue_id)
+        WHERE e.venue = m.venue
+        """,
+        list(venue_for_spelling),
+        [venue_ids[key] for key in venue_for_spelling.values()],
+    )
+
+
+
+async def _partition_events(conn: asyncpg.Connection) -> None:
+    """Rebuild `events` as a table range-partitioned by month on `event_date`."""
+    relkind = await conn.fetchval("SELECT relkind FROM pg_class WHERE oid = 'events'::regclass")
+    if relkind == "p":
+        return
+    await conn.execute("ALTER TABLE events RENAME TO events_unpartitioned")
+    # The id sequence outlives the old table; it keeps numbering new events.
+    await conn.execute("ALTER SEQUENCE events_id_seq OWNED BY NONE")
+    # Partitioned tables cannot be referenced by a foreign key on `id`
+    # alone; itinerary entries are removed when their partition is pruned.
+    await conn.execute(
+        "ALTER TABLE itinerary_events DROP CONSTRAINT IF EXISTS itinerary_events_event_id_fkey"
+    )
+    await conn.execute(
+        """
+        CREATE TABLE events (
+            id INTEGER NOT NULL DEFAULT nextval('events_id_seq'),
+            title TEXT NOT NULL,
+            datetime TEXT,
+            venue TEXT,
+            location TEXT,
+            latlong TEXT,
+            url TEXT,
+            description TEXT,
+            categories TEXT[],
+            source TEXT,
+            geo POINT,
+            geohash TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            change_seq BIGINT NOT NULL DEFAULT nextval('event_change_seq'),
+            sources TEXT[],
+            venue_id INTEGER REFERENCES venues(id),
+            source_categories TEXT[],
+            event_date DATE
+        ) PARTITION BY RANGE (event_date)
+        """
+    )
+    # The CHECK lets new monthly partitions skip scanning the default one.
+    await conn.execute(
+        f"""
+        CREATE TABLE {partitions.UNDATED_PARTITION} PARTITION OF events
+        (CONSTRAINT events_undated_no_date CHECK (event_date IS NULL)) DEFAULT
+        """
+    )
+
+    rows = await conn.fetch("SELECT id, datetime FROM events_unpartitioned")
+    dates = [partitions.event_date(row["datetime"]) for row in rows]
+    await partitions.ensure_partitions(conn, dates)
+    await partitions.ensure_upcoming(conn)
+    await conn.execute(
+        """
+        INSERT INTO events (
+            id, title, datetime, venue, location, latlong, url, description,
+            categories, source, geo, geohash, created_at, updated_at, change_seq,
+            sources, venue_id, source_categories, event_date
+        )
+        SELECT
+            e.id, e.title, e.datetime, e.venue, e.location, e.latlong, e.url,
+            e.description, e.categories, e.source, e.geo, e.geohash, e.created_at,
+            e.updated_at, e.change_seq, e.sources, e.venue_id, e.source_categories,
+            d.event_date
+        FROM (
+            -- The new unique index treats NULLs as equal; keep the first
+            -- of any rows that only differed by a NULL datetime or venue.
+            SELECT DISTINCT ON (title, datetime, venue) *
+            FROM events_unpartitioned
+            ORDER BY title, datetime, venue, id
+        ) e
+        JOIN unnest($1::int[], $2::date[]) AS d(id, event_date) ON d.id = e.id
+        """,
+        [row["id"] for row in rows],
+        dates,
+    )
+    await conn.execute(
+        """
+        INSERT INTO event_tombstones (event_id)
+        SELECT u.id FROM events_unpartitioned u
+        WHERE NOT EXISTS (SELECT 1 FROM events e WHERE e.id = u.id)
+        ON CONFLICT (event_id) DO NOTHING
+        """
+    )
+    await conn.execute(
+        """
+        DELETE FROM itinerary_events ie
+        WHERE NOT EXISTS (SELECT 1 FROM events e WHERE e.id = ie.event_id)
+        """
+    )
+    await conn.execute("DROP TABLE events_unpartitioned")
+    await conn.execute("ALTER SEQUENCE events_id_seq OWNED BY events.id")
+
+
+async def _local_event_dates(conn: asyncpg.Connection) -> None:
+    """Recompute `event_date` as the local day (UTC evening starts move back one)."""
+    rows = await conn.fetch("SELECT id, datetime, event_date FROM events")
+    changed = [
+        (row["id"], day)
+        for row in rows
+        if (day := partitions.event_date(row["datetime"])) != row["event_date"]
+    ]
+    if not changed:
+        return
+    await partitions.ensure_partitions(conn, [day for _, day in changed])
+    # Updating the partition key moves each row to its new month's partition.
+    await conn.execute(
+        """
+        UPDATE events e SET event_date = d.event_date
+        FROM unnest($1::int[], $2::date[]) AS d(id, event_date)
+        WHERE e.id = d.id
+        """,
+        [event_id for event_id, _ in changed],
+        [day for _, day in changed],
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "initial_schema",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                id SERIAL PRIMARY KEY,
+                title TEXT NOT NULL,
+                datetime TEXT,
+                venue TEXT,
+                location TEXT,
+                latlong TEXT,
+                url TEXT,
+                description TEXT,
+                categories TEXT[],
+                source TEXT
+            )
+            """,
+            "ALTER TABLE events ADD COLUMN IF NOT EXISTS datetime TEXT",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_events_title ON events (title, datetime, venue)",
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id UUID PRIMARY KEY,
+                email TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                display_name TEXT NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS refresh_tokens (
+                id UUID PRIMARY KEY,
+                user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                token_hash TEXT NOT NULL UNIQUE,
+                expires_at TIMESTAMPTZ NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user ON refresh_tokens (user_id)",
+            """
+            CREATE TABLE IF NOT EXISTS itineraries (
+                id UUID PRIMARY KEY,
+                user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                name TEXT NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS itinerary_events (
+                itinerary_id UUID NOT NULL REFERENCES itineraries(id) ON DELETE CASCADE,
+                event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+                sort_order INTEGER NOT NULL DEFAULT 0,
+                added_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (itinerary_id, event_id)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_itineraries_user ON itineraries (user_id)",
+        ),
+    ),
+    Migration(
+        2,
+        "data_generation",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS data_generation (
+                id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+                generation BIGINT NOT NULL DEFAULT 0
+            )
+            """,
+            """
+            INSERT INTO data_generation (id, generation) VALUES (TRUE, 0)
+            ON CONFLICT (id) DO NOTHING
+            """,
+        ),
+    ),
+    Migration(
+        3,
+        "events_geo_point",
+        (
+            # `geo` is point(lon, lat) parsed from the "lat,long" string.
+            "ALTER TABLE events ADD COLUMN IF NOT EXISTS geo POINT",
+            _backfill_geo,
+            "CREATE INDEX IF NOT EXISTS idx_events_geo ON events USING gist (geo)",
+        ),
+    ),
+    Migration(
+        4,
+        "events_geohash",
+        (
+            "ALTER TABLE events ADD COLUMN IF NOT EXISTS geohash TEXT",
+            _backfill_geohash,
+            """
+            CREATE INDEX IF NOT EXISTS idx_events_geohash
+            ON events (geohash text_pattern_ops)
+            """,
+        ),
+    ),
+    Migration(
+        5,
+        "change_tracking",
+        (
+            # Every insert, real update and deletion takes the next value of
+            # one sequence, so a sync token is the highest change_seq seen.
+            "CREATE SEQUENCE IF NOT EXISTS event_change_seq",
+            """
+            ALTER TABLE events
+                ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL
+                    DEFAULT nextval('event_change_seq')
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_events_change_seq ON events (change_seq)",
+            """
+            CREATE TABLE IF NOT EXISTS event_tombstones (
+                event_id INTEGER PRIMARY KEY,
+                change_seq BIGINT NOT NULL DEFAULT nextval('event_change_seq'),
+                deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_event_tombstones_change_seq
+            ON event_tombstones (change_seq)
+            """,
+            # Sync tokens older than the newest expired tombstone can no
+            # longer be answered incrementally.
+            """
+            ALTER TABLE data_generation
+            ADD COLUMN IF NOT EXISTS tombstone_horizon BIGINT NOT NULL DEFAULT 0
+            """,
+        ),
+    ),
+    Migration(
+        6,
+        "events_sources",
+        (
+            # Every source that listed the event; `source` keeps the first.
+            "ALTER TABLE events ADD COLUMN IF NOT EXISTS sources TEXT[]",
+            """
+            UPDATE events SET sources = ARRAY[source]
+            WHERE sources IS NULL AND source IS NOT NULL
+            """,
+            # Dedupe blocks on the calendar day of the "YYYY-MM-DD..." string.
+            "CREATE INDEX IF NOT EXISTS idx_events_day ON events (LEFT(datetime, 10))",
+        ),
+    ),
+    Migration(
+        7,
+        "venues",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS venues (
+                id SERIAL PRIMARY KEY,
+                name TEXT NOT NULL,
+                location TEXT,
+                latlong TEXT,
+                geo POINT,
+                geohash TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """,
+            # One row per normalized spelling (`venues.venue_key`).
+            """
+            CREATE TABLE IF NOT EXISTS venue_aliases (
+                alias_key TEXT PRIMARY KEY,
+                venue_id INTEGER NOT NULL REFERENCES venues(id) ON DELETE CASCADE,
+                alias TEXT NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_venue_aliases_venue ON venue_aliases (venue_id)",
+            "ALTER TABLE events ADD COLUMN IF NOT EXISTS venue_id INTEGER REFERENCES venues(id)",
+            _backfill_venues,
+            "CREATE INDEX IF NOT EXISTS idx_events_venue_id ON events (venue_id)",
+        ),
+    ),
+    Migration(
+        8,
+        "category_recompute",
+        (
+            # The labels sources supplied, kept so categories can be
+            # recomputed when the rules change. Until now `categories` held
+            # exactly those labels (lowercased).
+            "ALTER TABLE events ADD COLUMN IF NOT EXISTS source_categories TEXT[]",
+            """
+            UPDATE events SET source_categories = categories
+            WHERE source_categories IS NULL AND categories IS NOT NULL
+            """,
+            # Last id processed by a resumable batch job (see recategorize.py).
+            """
+            CREATE TABLE IF NOT EXISTS job_checkpoints (
+                job TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """,
+        ),
+    ),
+    Migration(
+        9,
+        "events_partitioned",
+        (
+            # Range-partitioned by month of the event (see partitions.py).
+            # Drops the itinerary_events foreign key (see the module docstring).
+            _partition_events,
+            # Unique indexes on a partitioned table must include the key.
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_events_id ON events (id, event_date)",
+            # NULLS NOT DISTINCT so undated events still dedupe on re-scrape
+            # (requires PostgreSQL 15+).
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_events_title
+            ON events (title, datetime, venue, event_date) NULLS NOT DISTINCT
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_events_geo ON events USING gist (geo)",
+            """
+            CREATE INDEX IF NOT EXISTS idx_events_geohash
+            ON events (geohash text_pattern_ops)
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_events_change_seq ON events (change_seq)",
+            "CREATE INDEX IF NOT EXISTS idx_events_venue_id ON events (venue_id)",
+            "CREATE INDEX IF NOT EXISTS idx_events_event_date ON events (event_date)",
+        ),
+    ),
+    Migration(
+        10,
+        "change_seq_lock",
+        (
+            # A sequence value is claimed before its row commits, so a sync
+            # token read from the sequence alone can run past rows that are
+            # not visible yet. Claiming through this function holds
+            # CHANGE_SEQ_LOCK_ID shared until commit; /events/changes takes
+            # it exclusively to wait those writers out.
+            """
+            CREATE OR REPLACE FUNCTION next_change_seq() RETURNS BIGINT
+            LANGUAGE sql VOLATILE AS $$
+                SELECT pg_advisory_xact_lock_shared(1594753026);  -- CHANGE_SEQ_LOCK_ID
+                SELECT nextval('event_change_seq');
+            $$
+            """,
+            "ALTER TABLE events ALTER COLUMN change_seq SET DEFAULT next_change_seq()",
+            "ALTER TABLE event_tombstones ALTER COLUMN change_seq SET DEFAULT next_change_seq()",
+        ),
+    ),
+    Migration(
+        11,
+        "event_date_local",
+        (
+            # Migration 9 took the day from the datetime's text, so UTC
+            # starts were filed under the next day (and month).
+            _local_event_dates,
+        ),
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+_CREATE_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+"""
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+async def current_version(conn: asyncpg.Connection) -> int:
+    """Highest applied version; 0 for a database that predates this table."""
+    exists = await conn.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not exists:
+        return 0
+    return await conn.fetchval("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+
+
+async def check_version(conn: asyncpg.Connection) -> int:
+    """One query on startup: refuse to serve a schema older than the code."""
+    version = await current_version(conn)
+    if version < LATEST_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, this build needs "
+            f"{LATEST_VERSION}. Run: python migrations.py"
+        )
+    return version
+
+
+async def _verify_checksums(conn: asyncpg.Connection) -> None:
+    applied = await conn.fetch("SELECT version, name, checksum FROM schema_migrations")
+    by_version = {m.version: m for m in MIGRATIONS}
+    for row in applied:
+        migration = by_version.get(row["version"])
+        if migration is not None and migration.checksum != row["checksum"]:
+            raise SchemaVersionError(
+                f"Migration {row['version']} ({row['name']}) was edited after it "
+                f"was applied; add a new migration instead."
+            )
+
+
+async def _run_step(conn: asyncpg.Connection, step: Step) -> None:
+    if isinstance(step, str):
+        await conn.execute(step)
+    else:
+        _import_step_modules()
+        await step(conn)
+
+
+async def migrate(conn: asyncpg.Connection, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to `target` (default: latest); returns versions applied."""
+    target = LATEST_VERSION if target is None else target
+    await conn.execute(_CREATE_MIGRATIONS_TABLE)
+    applied: List[int] = []
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", _ADVISORY_LOCK_ID)
+        await _verify_checksums(conn)
+        done = {
+            r["version"] for r in await conn.fetch("SELECT version FROM schema_migrations")
+        }
+        for migration in MIGRATIONS:
+            if migration.version in done or migration.version > target:
+                continue
+            async with conn.transaction():
+                for step in migration.steps:
+                    await _run_step(conn, step)
+                await conn.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+                    migration.version,
+                    migration.name,
+                    migration.checksum,
+                )
+            applied.append(migration.version)
+            print(f"✅ Applied migration {migration.version}: {migration.name}")
+    return applied
+
+
+async def status(conn: asyncpg.Connection) -> None:
+    await conn.execute(_CREATE_MIGRATIONS_TABLE)
+    applied = {
+        r["version"]: r
+        for r in await conn.fetch("SELECT version, checksum, applied_at FROM schema_migrations")
+    }
+    for migration in MIGRATIONS:
+        row = applied.get(migration.version)
+        if row is None:
+            state = "pending"
+        elif row["checksum"] != migration.checksum:
+            state = "CHECKSUM MISMATCH"
+        else:
+            state = f"applied {row['applied_at']:%Y-%m-%d %H:%M}"
+        print(f"{migration.version:>4}  {migration.name:<24} {state}")
+
+
+async def _main(command: str) -> int:
+    load_dotenv()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("❌ DATABASE_URL is not set")
+        return 1
+    conn = await asyncpg.connect(database_url, **connect_kwargs_for(database_url))
+    try:
+        if command == "status":
+            await status(conn)
+        else:
+            applied = await migrate(conn)
+            if not applied:
+                print(f"✅ Schema is up to date (version {LATEST_VERSION})")
+    except SchemaVersionError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        await conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    if command not in ("migrate", "status"):
+        print("Usage: python migrations.py [migrate|status]")
+        sys.exit(2)
+    sys.exit(asyncio.run(_main(command)))
@@ -0,0 +1,178 @@
+"""
+Monthly range partitions of `events`.
+
+`events` is partitioned on `event_date`, the local calendar day its
+datetime falls on (`event_time.local_date`: a UTC evening start belongs to
+the day before), one partition per month (`events_2025_06`). Rows whose
+datetime is missing or does not start with a valid date go to the default
+partition `events_undated`. Date-filtered reads only scan the
+months they overlap, and pruning a past month detaches and drops its
+partition instead of deleting rows one by one (no index churn, no dead
+tuples left for vacuum).
+
+Partitions are created ahead of time (`ensure_upcoming`, called when
+pruning) and on demand for any month an ingest batch reaches
+(`ensure_partitions`).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from datetime import date
+from typing import Awaitable, Callable, Iterable, Optional
+
+import asyncpg
+
+from event_time import local_date
+
+# Months past the current one to keep partitions ready for.
+PARTITION_MONTHS_AHEAD = int(os.getenv("EVENTS_PARTITION_MONTHS_AHEAD", "3"))
+
+UNDATED_PARTITION = "events_undated"
+
+_PARTITION_NAME_RE = re.compile(r"^events_(\d{4})_(\d{2})$")
+
+# DETACH needs an ACCESS EXCLUSIVE lock on `events`, and queries queue
+# behind it while it waits, so each attempt gives up quickly and retries.
+DETACH_LOCK_TIMEOUT_MS = int(os.getenv("PRUNE_LOCK_TIMEOUT_MS", "1000"))
+DETACH_ATTEMPTS = int(os.getenv("PRUNE_DETACH_ATTEMPTS", "10"))
+
+
+def event_date(datetime_text: Optional[str]) -> Optional[date]:
+    """The partition key for a stored datetime string; None when it has no date."""
+    return local_date(datetime_text)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"events_{month:%Y_%m}"
+
+
+async def list_partitions(conn: asyncpg.Connection) -> dict[date, str]:
+    """Month -> partition name for every monthly partition of `events`."""
+    rows = await conn.fetch(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'events'::regclass
+        """
+    )
+    months = {}
+    for row in rows:
+        match = _PARTITION_NAME_RE.match(row["relname"])
+        if match:
+            months[date(int(match.group(1)), int(match.group(2)), 1)] = row["relname"]
+    return months
+
+
+async def ensure_partitions(conn: asyncpg.Connection, days: Iterable[Optional[date]]) -> list[str]:
+    """Create the partitions for the months of `days` that do not exist yet."""
+    wanted = {month_start(day) for day in days if day is not None}
+    if not wanted:
+        return []
+    existing = await list_partitions(conn)
+    created = []
+    for month in sorted(wanted - existing.keys()):
+        name = partition_name(month)
+        await conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {name} PARTITION OF events
+            FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')
+            """
+        )
+        created.append(name)
+    if created:
+        print(f"🗂️  Created event partitions: {', '.join(created)}")
+    return created
+
+
+async def ensure_upcoming(conn: asyncpg.Connection, today: Optional[date] = None) -> list[str]:
+    """Partitions for this month and the next `PARTITION_MONTHS_AHEAD`."""
+    month = month_start(today or date.today())
+    months = [month]
+    for _ in range(PARTITION_MONTHS_AHEAD):
+        month = next_month(month)
+        months.append(month)
+    return await ensure_partitions(conn, months)
+
+
+async def _detach(conn: asyncpg.Connection, name: str) -> bool:
+    """DETACH inside a savepoint, retried while long readers hold `events`."""
+    await conn.execute(f"SET LOCAL lock_timeout = {DETACH_LOCK_TIMEOUT_MS}")
+    for attempt in range(1, DETACH_ATTEMPTS + 1):
+        try:
+            async with conn.transaction():
+                await conn.execute(f"ALTER TABLE events DETACH PARTITION {name}")
+            return True
+        except asyncpg.LockNotAvailableError:
+            print(f"⏳ {name}: events is busy, detach attempt {attempt}/{DETACH_ATTEMPTS} timed out")
+            await asyncio.sleep(min(attempt, 5))
+    return False
+
+
+async def drop_expired(
+    conn: asyncpg.Connection,
+    before: date,
+    archive: Optional[Callable[[asyncpg.Connection, str, date], Awaitable[Optional[str]]]] = None,
+) -> tuple[list[str], int, list[str]]:
+    """
+    Drop every monthly partition that ends on or before `before`.
+
+    Each partition goes in its own transaction. New rows are locked out
+    first, so `archive` (if given) sees exactly the rows being dropped.
+    The partition is then detached, giving up after a short lock timeout
+    and retrying so readers never queue behind a waiting DETACH for long.
+    Once detached, its ids are tombstoned for /events/changes, itinerary
+    entries pointing at them are removed (a partitioned table cannot be
+    the target of a foreign key on `id` alone) and it is dropped. A month
+    that cannot be detached is left for the next prune. Returns the
+    dropped partition names, the number of events they held and the
+    archive files written.
+    """
+    dropped = []
+    events = 0
+    archived = []
+    for month, name in sorted((await list_partitions(conn)).items()):
+        if next_month(month) > before:
+            continue
+        async with conn.transaction():
+            await conn.execute(f"LOCK TABLE {name} IN SHARE MODE")
+            path = await archive(conn, name, month) if archive is not None else None
+            if not await _detach(conn, name):
+                # Nothing was changed; drop the archive file so the rows
+                # are not in both places until the next prune rewrites it.
+                if path is not None:
+                    os.remove(path)
+                print(f"⚠️  Skipped {name}: could not detach it from events")
+                continue
+            result = await conn.execute(
+                f"""
+                INSERT INTO event_tombstones (event_id)
+                SELECT id FROM {name}
+                ON CONFLICT (event_id) DO UPDATE SET
+                    change_seq = next_change_seq(),
+                    deleted_at = NOW()
+                """
+            )
+            await conn.execute(
+                f"DELETE FROM itinerary_events WHERE event_id IN (SELECT id FROM {name})"
+            )
+            await conn.execute(f"DROP TABLE {name}")
+        if path is not None:
+            archived.append(path)
+        events += int(result.split(" ")[-1])  # e.g. "INSERT 0 5"
+        dropped.append(name)
+    if dropped:
+        print(f"🗑️  Dropped event partitions: {', '.join(dropped)} ({events} events)")
+    if archived:
+        print(f"📦 Archived to {', '.join(archived)}")
+    return dropped, events, archived
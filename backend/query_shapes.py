@@ -0,0 +1,114 @@
+"""
+Per-shape timing for the dynamic event queries.
+
+`_build_event_filters` emits one canonical SQL text per filter signature
+(which filters are present, not their values), so asyncpg's per-connection
+statement cache can keep each shape prepared and Postgres can move it onto
+a generic plan. The pool's cache is sized by `DB_STATEMENT_CACHE_SIZE` to
+hold every shape the API actually produces.
+
+Every execution records its wall time. The first execution of a shape in
+this process, and every `QUERY_STATS_SAMPLE_EVERY`th one after that, also
+runs `EXPLAIN (ANALYZE, SUMMARY)` to sample the server's planning versus
+execution time: planning is what each call would pay if the statement were
+not reused.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+import asyncpg
+
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "512"))
+
+_SAMPLE_EVERY = int(os.getenv("QUERY_STATS_SAMPLE_EVERY", "500"))
+_MAX_SHAPES = 512
+
+
+class ShapeStats:
+    def __init__(self, kind: str, sql: str):
+        self.kind = kind
+        self.sql = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = 0
+        self.plan_ms = 0.0
+        self.exec_ms = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "shape": f"{self.kind}:{hashlib.sha1(self.sql.encode()).hexdigest()[:12]}",
+            "sql": self.sql,
+            "calls": self.calls,
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else None,
+            "max_ms": round(self.max_ms, 3),
+            "samples": self.samples,
+            "plan_ms": round(self.plan_ms / self.samples, 3) if self.samples else None,
+            "exec_ms": round(self.exec_ms / self.samples, 3) if self.samples else None,
+        }
+
+
+_shapes: OrderedDict[str, ShapeStats] = OrderedDict()
+
+
+def _stats_for(kind: str, sql: str) -> ShapeStats:
+    stats = _shapes.get(sql)
+    if stats is None:
+        stats = _shapes[sql] = ShapeStats(kind, sql)
+        while len(_shapes) > _MAX_SHAPES:
+            _shapes.popitem(last=False)
+    _shapes.move_to_end(sql)
+    return stats
+
+
+async def _sample_plan(
+    conn: asyncpg.Connection, stats: ShapeStats, sql: str, args: tuple
+) -> None:
+    try:
+        plan = await conn.fetchval(
+            f"EXPLAIN (ANALYZE, TIMING OFF, SUMMARY, FORMAT JSON) {sql}", *args
+        )
+    except asyncpg.PostgresError as e:
+        print(f"⚠️  Plan sample failed for {stats.kind}: {e}")
+        return
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    stats.samples += 1
+    stats.plan_ms += plan[0].get("Planning Time", 0.0)
+    stats.exec_ms += plan[0].get("Execution Time", 0.0)
+
+
+async def _timed(conn: asyncpg.Connection, kind: str, method: str, sql: str, args: tuple):
+    stats = _stats_for(kind, sql)
+    started = time.perf_counter()
+    result = await getattr(conn, method)(sql, *args)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    stats.calls += 1
+    stats.total_ms += elapsed_ms
+    stats.max_ms = max(stats.max_ms, elapsed_ms)
+    if stats.calls == 1 or stats.calls % _SAMPLE_EVERY == 0:
+        await _sample_plan(conn, stats, sql, args)
+    return result
+
+
+async def fetch(conn: asyncpg.Connection, kind: str, sql: str, *args: Any) -> List[asyncpg.Record]:
+    return await _timed(conn, kind, "fetch", sql, args)
+
+
+async def fetchval(conn: asyncpg.Connection, kind: str, sql: str, *args: Any) -> Optional[Any]:
+    return await _timed(conn, kind, "fetchval", sql, args)
+
+
+def snapshot() -> List[dict]:
+    """All tracked shapes, busiest first."""
+    return sorted(
+        (stats.to_dict() for stats in _shapes.values()),
+        key=lambda s: s["calls"] * (s["mean_ms"] or 0.0),
+        reverse=True,
+    )
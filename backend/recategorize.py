@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Recompute `events.categories` with the current classifier rules.
+
+Streams the table in id order through a server-side cursor, classifies
+each batch with one `classify_events` call (title, description, venue and
+the stored `source_categories`), and writes back only the rows whose
+categories changed: the changes are COPYed into a temporary staging table
+and applied with one `UPDATE ... FROM`. Each batch commits together with
+a checkpoint in `job_checkpoints`, so an interrupted run picks up after
+the last committed id.
+
+    python recategorize.py                  # run, resuming any checkpoint
+    python recategorize.py --restart        # ignore the checkpoint
+    python recategorize.py --dry-run        # count changes, write nothing
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Optional
+
+import asyncpg
+from dotenv import load_dotenv
+
+import db_pools
+import event_cache
+from data_from_apis.categories import classify_events
+
+JOB_NAME = "recategorize"
+
+DEFAULT_BATCH_SIZE = 5000
+
+_SELECT_SQL = """
+    SELECT id, title, description, venue,
+        source_categories AS categories, categories AS current_categories
+    FROM events
+    WHERE id > $1
+    ORDER BY id
+"""
+
+_CREATE_STAGE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS recategorize_stage (
+        id INTEGER PRIMARY KEY,
+        categories TEXT[] NOT NULL
+    ) ON COMMIT DELETE ROWS
+"""
+
+_APPLY_SQL = """
+    UPDATE events e SET
+        categories = s.categories,
+        updated_at = NOW(),
+        change_seq = next_change_seq()
+    FROM recategorize_stage s
+    WHERE e.id = s.id AND e.categories IS DISTINCT FROM s.categories
+"""
+
+
+async def _checkpoint(conn: asyncpg.Connection) -> int:
+    last_id = await conn.fetchval("SELECT last_id FROM job_checkpoints WHERE job = $1", JOB_NAME)
+    return last_id or 0
+
+
+async def _apply_batch(
+    conn: asyncpg.Connection, changes: list[tuple[int, list[str]]], last_id: int
+) -> int:
+    async with conn.transaction():
+        updated = 0
+        if changes:
+            await conn.copy_records_to_table(
+                "recategorize_stage", records=changes, columns=["id", "categories"]
+            )
+            result = await conn.execute(_APPLY_SQL)
+            updated = int(result.split(" ")[-1])  # e.g. "UPDATE 12"
+        await conn.execute(
+            """
+            INSERT INTO job_checkpoints (job, last_id) VALUES ($1, $2)
+            ON CONFLICT (job) DO UPDATE SET last_id = EXCLUDED.last_id, updated_at = NOW()
+            """,
+            JOB_NAME,
+            last_id,
+        )
+    return updated
+
+
+async def recategorize(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    restart: bool = False,
+    dry_run: bool = False,
+) -> dict:
+    """Run the job to the end; returns counts of rows scanned and updated."""
+    started = time.perf_counter()
+    scanned = changed = updated = 0
+    # One connection streams the cursor in a snapshot; the other commits batches.
+    async with db_pools.connection("write") as reader, db_pools.connection("write") as writer:
+        if restart and not dry_run:
+            await writer.execute("DELETE FROM job_checkpoints WHERE job = $1", JOB_NAME)
+        resume_after = 0 if restart else await _checkpoint(writer)
+        if resume_after:
+            print(f"↩️  Resuming after event id {resume_after}")
+        await writer.execute(_CREATE_STAGE_SQL)
+
+        async with reader.transaction(isolation="repeatable_read", readonly=True):
+            cursor = await reader.cursor(_SELECT_SQL, resume_after)
+            while True:
+                rows = await cursor.fetch(batch_size)
+                if not rows:
+                    break
+                scanned += len(rows)
+                changes = [
+                    (row["id"], categories)
+                    for row, categories in zip(rows, classify_events(rows))
+                    if categories != (row["current_categories"] or [])
+                ]
+                changed += len(changes)
+                if not dry_run:
+                    updated += await _apply_batch(writer, changes, rows[-1]["id"])
+
+        if not dry_run:
+            await writer.execute("DELETE FROM job_checkpoints WHERE job = $1", JOB_NAME)
+            if updated:
+                await event_cache.bump_generation(writer)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"🏷️  Recategorized {scanned} events in {elapsed:.1f}s:"
+        f" {changed} changed{' (dry run)' if dry_run else f', {updated} updated'}"
+    )
+    return {
+        "scanned": scanned,
+        "changed": changed,
+        "updated": updated,
+        "dry_run": dry_run,
+        "seconds": round(elapsed, 2),
+    }
+
+
+async def _main(args: argparse.Namespace) -> int:
+    load_dotenv()
+    database_url: Optional[str] = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("❌ DATABASE_URL is not set")
+        return 1
+    db_pools.configure(database_url, None)
+    await recategorize(args.batch_size, restart=args.restart, dry_run=args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Count changes without writing")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,170 @@
+"""
+Precomputed daily snapshots of the upcoming event window.
+
+After a scrape, `build_snapshots` writes one gzip-compressed JSON array per
+calendar day (same shape as `/events`) plus a `manifest.json` that maps each
+day to its file and content hash. Day files are named after their hash, so
+clients can cache them forever; only the manifest needs revalidation.
+
+`SNAPSHOT_DIR` lives outside the source tree and is meant to be served by a
+reverse proxy or synced to a CDN, so those reads never reach Python or
+Postgres (see the README for an nginx example). `SnapshotFiles` serves the
+same files from the API, behind the read key, for setups without one.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncpg
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+from event_json import encode_events
+
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR") or os.path.join(
+    os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), "events", "snapshots"
+)
+SNAPSHOT_DAYS = int(os.getenv("SNAPSHOT_DAYS", "35"))
+
+# `private`: the files need an API key, so shared caches must not keep them.
+_IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+_MANIFEST_CACHE_CONTROL = "private, max-age=300, must-revalidate"
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), "rb") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_snapshots(
+    directory: str,
+    start: date,
+    days: int,
+    by_day: dict[str, list[Any]],
+    generation: Optional[int],
+) -> dict:
+    os.makedirs(directory, exist_ok=True)
+    end = start + timedelta(days=days - 1)
+    manifest_days = {}
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        body = encode_events(by_day.get(day, []))
+        digest = hashlib.sha256(body).hexdigest()
+        filename = f"events-{day}.{digest[:16]}.json.gz"
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            # mtime=0 keeps the compressed bytes identical for identical content.
+            _write_atomic(path, gzip.compress(body, compresslevel=9, mtime=0))
+        manifest_days[day] = {
+            "file": filename,
+            "sha256": digest,
+            "count": len(by_day.get(day, [])),
+        }
+
+    previous = _read_manifest(directory)
+    manifest = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "generation": generation,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": manifest_days,
+    }
+    _write_atomic(
+        os.path.join(directory, MANIFEST_NAME),
+        json.dumps(manifest, indent=2).encode("utf-8"),
+    )
+
+    # Keep files the previous manifest referenced so clients holding it can
+    # still finish loading; anything older goes.
+    keep = {entry["file"] for entry in manifest_days.values()}
+    if previous:
+        keep.update(entry["file"] for entry in previous.get("days", {}).values())
+    for name in os.listdir(directory):
+        if name.startswith("events-") and name.endswith(".json.gz") and name not in keep:
+            os.remove(os.path.join(directory, name))
+
+    return manifest
+
+
+async def build_snapshots(
+    conn: asyncpg.Connection,
+    directory: str = SNAPSHOT_DIR,
+    start: Optional[date] = None,
+    days: int = SNAPSHOT_DAYS,
+    generation: Optional[int] = None,
+) -> dict:
+    """
+    Write day files for [start, start + days) and return the new manifest.
+    Encoding, gzip and file writes run in the threadpool so the event loop
+    keeps serving requests meanwhile.
+    """
+    start = start or date.today()
+    end = start + timedelta(days=days - 1)
+
+    rows = await conn.fetch(
+        """
+        SELECT id, title, datetime, venue, venue_id, location, latlong, url, description, categories, source, sources, event_date
+        FROM events
+        WHERE event_date >= $1 AND event_date <= $2
+        ORDER BY datetime ASC, id
+        """,
+        start,
+        end,
+    )
+    by_day: dict[str, list[Any]] = {}
+    for row in rows:
+        # The local day, like `on_date` (a UTC datetime may carry the next one).
+        by_day.setdefault(row["event_date"].isoformat(), []).append(row)
+
+    return await run_in_threadpool(_write_snapshots, directory, start, days, by_day, generation)
+
+
+class SnapshotFiles(StaticFiles):
+    """
+    Serves snapshot files with immutable caching and gzip content encoding.
+    `verify_key`, if given, is awaited with the request's X-API-Key header
+    before anything is served and raises to reject it.
+    """
+
+    def __init__(
+        self,
+        *args,
+        verify_key: Optional[Callable[[Optional[str]], Awaitable[None]]] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.verify_key = verify_key
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and self.verify_key is not None:
+            await self.verify_key(Headers(scope=scope).get("x-api-key"))
+        await super().__call__(scope, receive, send)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        name = os.path.basename(full_path)
+        if name == MANIFEST_NAME:
+            response.headers["Cache-Control"] = _MANIFEST_CACHE_CONTROL
+        elif name.endswith(".json.gz"):
+            response.headers["Content-Type"] = "application/json"
+            response.headers["Content-Encoding"] = "gzip"
+            response.headers["Cache-Control"] = _IMMUTABLE_CACHE_CONTROL
+        return response
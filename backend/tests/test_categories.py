@@ -0,0 +1,19 @@
+from data_from_apis.categories import determine_categories
+
+
+def _categories(title):
+    return determine_categories(title, None, None, None)
+
+
+def test_common_words_do_not_tag_unrelated_events():
+    assert "sports" not in _categories("Board Game Night")
+    assert "music" not in _categories("Rock climbing intro")
+    assert "culture" not in _categories("Bartending class")
+    assert _categories("World-class Chamber Music") == ["music"]
+
+
+def test_phrases_still_tag_their_category():
+    assert _categories("Rock concert in the park") == ["music"]
+    assert _categories("Giants home game") == ["sports"]
+    assert _categories("Pottery classes for beginners") == ["culture"]
+    assert "active" in _categories("Rock climbing intro")
@@ -0,0 +1,121 @@
+from dedupe import DedupeIndex, is_match, make_candidate
+
+
+def _candidate(title, datetime_value, venue="SFMOMA", sources=("dothebay",), event_id=None, in_batch=True):
+    return make_candidate(event_id, title, datetime_value, venue, None, sources, in_batch=in_batch)
+
+
+def _ingest(index, listings, stored):
+    """The matching steps of `populate_database`, with `stored` as the events table."""
+    for title, datetime_value, source in listings:
+        candidate = _candidate(title, datetime_value, sources=(source,))
+        match_id = index.find(candidate)
+        if match_id is not None:
+            stored[match_id]["sources"].add(source)
+            index.add_sources(match_id, [source])
+            continue
+        candidate.id = len(stored) + 1
+        stored[candidate.id] = {"title": title, "datetime": datetime_value, "sources": {source}}
+        index.add(candidate)
+
+
+def _load_index(stored):
+    """What `load_index` builds from the stored rows at the start of an ingest."""
+    return DedupeIndex(
+        _candidate(row["title"], row["datetime"], sources=row["sources"], event_id=event_id, in_batch=False)
+        for event_id, row in stored.items()
+    )
+
+
+def test_make_candidate_normalizes_title_and_blocks():
+    c = make_candidate(1, "The Warfield Presents: Artist!", "2026-11-02T20:30:00-0800", "The Warfield, SF", "9q8yyk8yt", ["ticketmaster"])
+    assert c.day == "2026-11-02"
+    assert c.start_minutes == 20 * 60 + 30
+    assert c.title == "warfield artist"
+    assert c.venue_token == "warfield"
+    assert c.geocell == "9q8yyk"
+    assert c.sources == frozenset({"ticketmaster"})
+
+
+def test_make_candidate_needs_title_and_date():
+    assert make_candidate(None, "", "2026-11-02", "X", None) is None
+    assert make_candidate(None, "Show", None, "X", None) is None
+    assert make_candidate(None, "Show", "TBA", "X", None) is None
+
+
+def test_same_event_from_another_source_matches():
+    stored = _candidate("Artist Name Live", "2026-11-02T20:00:00Z", sources=("ticketmaster",))
+    incoming = _candidate("Artist Name", "2026-11-02T20:00:00Z", sources=("dothebay",))
+    assert is_match(incoming, stored)
+
+
+def test_same_source_never_matches_within_a_batch():
+    stored = _candidate("Guided Tour: Modern Art", "2026-11-02T10:00:00Z", sources=("sfmoma",))
+    incoming = _candidate("Guided Tour: Modern Art", "2026-11-02T10:00:00Z", sources=("sfmoma",))
+    assert not is_match(incoming, stored)
+
+
+def test_different_start_times_do_not_match():
+    stored = _candidate("Guided Tour: Modern Art", "2026-11-02T10:00:00Z", sources=("sfmoma",))
+    second_showing = _candidate("Guided Tour: Modern Art", "2026-11-02T11:30:00Z", sources=("dothebay",))
+    other_tour = _candidate("Guided Tour: Asian Art", "2026-11-02T11:00:00Z", sources=("dothebay",))
+    assert not is_match(second_showing, stored)
+    assert not is_match(other_tour, stored)
+
+
+def test_missing_time_on_one_side_still_matches():
+    stored = _candidate("Holiday Market", "2026-12-05", sources=("funcheap",))
+    incoming = _candidate("Holiday Market", "2026-12-05T10:00:00Z", sources=("dothebay",))
+    assert is_match(incoming, stored)
+
+
+def test_different_days_do_not_match():
+    stored = _candidate("Artist", "2026-11-02T20:00:00Z", sources=("ticketmaster",))
+    incoming = _candidate("Artist", "2026-11-03T20:00:00Z", sources=("dothebay",))
+    assert not is_match(incoming, stored)
+
+
+def test_stored_row_matches_a_rescrape_from_its_own_source():
+    stored = _candidate("Artist Name Live", "2026-11-02T20:00:00Z", sources=("ticketmaster", "dothebay"), event_id=7, in_batch=False)
+    week2 = _candidate("Artist Name", "2026-11-02T20:00:00Z", sources=("dothebay",))
+    assert DedupeIndex([stored]).find(week2) == 7
+
+
+def test_rescrape_prefers_the_row_its_source_listed():
+    other = _candidate("Artist Name", "2026-11-02T20:00:00Z", sources=("ticketmaster",), event_id=1, in_batch=False)
+    own = _candidate("Artist Name Tour", "2026-11-02T20:00:00Z", sources=("dothebay",), event_id=2, in_batch=False)
+    week2 = _candidate("Artist Name", "2026-11-02T20:00:00Z", sources=("dothebay",))
+    assert DedupeIndex([other, own]).find(week2) == 2
+
+
+def test_second_ingest_run_adds_no_duplicates():
+    week1 = [
+        ("Artist Name Live", "2026-11-02T20:00:00Z", "ticketmaster"),
+        ("Artist Name", "2026-11-02T20:00:00Z", "dothebay"),
+        ("Guided Tour: Modern Art", "2026-11-02T10:00:00Z", "dothebay"),
+        ("Guided Tour: Asian Art", "2026-11-02T10:00:00Z", "dothebay"),
+    ]
+    stored = {}
+    _ingest(DedupeIndex(), week1, stored)
+    assert [row["sources"] for row in stored.values()] == [{"ticketmaster", "dothebay"}, {"dothebay"}, {"dothebay"}]
+
+    week2 = [listing for listing in week1 if listing[2] == "dothebay"]
+    _ingest(_load_index(stored), week2, stored)
+    assert len(stored) == 3
+
+
+def test_index_stops_matching_a_source_once_merged():
+    index = DedupeIndex([_candidate("Artist Name", "2026-11-02T20:00:00Z", sources=("ticketmaster",), event_id=7, in_batch=False)])
+    incoming = _candidate("Artist Name Live", "2026-11-02T20:00:00Z", sources=("dothebay",))
+    assert index.find(incoming) == 7
+    index.add_sources(7, ["dothebay"])
+    assert index.find(incoming) is None
+
+
+def test_utc_and_offset_listings_of_one_show_match():
+    # Ticketmaster gives UTC; DoTheBay and Resident Advisor give local time with an offset.
+    ticketmaster = _candidate("Artist Name", "2026-11-03T04:00:00Z", sources=("ticketmaster",), event_id=1, in_batch=False)
+    dothebay = _candidate("Artist Name", "2026-11-02T20:00-0800", sources=("dothebay",))
+    assert ticketmaster.day == dothebay.day == "2026-11-02"
+    assert ticketmaster.start_minutes == dothebay.start_minutes == 20 * 60
+    assert DedupeIndex([ticketmaster]).find(dothebay) == 1
@@ -0,0 +1,28 @@
+import math
+
+from geo import EARTH_RADIUS_M, radius_bbox
+
+
+def _destination(lon, lat, bearing, distance_m):
+    """Point `distance_m` from (lon, lat) along `bearing` on the haversine sphere."""
+    d = distance_m / EARTH_RADIUS_M
+    p1 = math.radians(lat)
+    p2 = math.asin(math.sin(p1) * math.cos(d) + math.cos(p1) * math.sin(d) * math.cos(bearing))
+    l2 = math.radians(lon) + math.atan2(
+        math.sin(bearing) * math.sin(d) * math.cos(p1), math.cos(d) - math.sin(p1) * math.sin(p2)
+    )
+    return math.degrees(l2), math.degrees(p2)
+
+
+def test_radius_bbox_contains_the_circle():
+    for lon, lat in ((-122.42, 37.77), (0.0, 0.0), (25.0, 70.0), (-70.0, -55.0)):
+        for radius in (100, 2000, 50000):
+            min_lon, min_lat, max_lon, max_lat = radius_bbox(lon, lat, radius)
+            for step in range(360):
+                x, y = _destination(lon, lat, math.radians(step), radius)
+                assert min_lon <= x <= max_lon and min_lat <= y <= max_lat
+
+
+def test_radius_bbox_edge_is_not_short_of_the_radius():
+    _, _, _, max_lat = radius_bbox(-122.42, 37.77, 50000)
+    assert math.radians(max_lat - 37.77) * EARTH_RADIUS_M >= 50000
@@ -0,0 +1,195 @@
+"""
+The `venues` dimension: one row per physical place, shared by its events.
+
+Scrapers spell the same venue many ways ("The Warfield", "Warfield
+Theatre", "The Warfield, San Francisco, CA"). Each spelling is reduced to
+a normalized key, and `venue_aliases` maps keys to a venue, so resolving a
+venue at ingest is one dict lookup after the first sighting and one
+primary-key lookup before it. A venue is geocoded once, when it is first
+created; its coordinates are then copied onto every event listed there.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+
+from dedupe import fold_text
+from geo import geohash_encode, parse_latlong
+
+# Words that vary between listings of the same place without telling venues apart.
+_NOISE_WORDS = {"the", "and", "sf", "theatre", "theater"}
+_CITY_SUFFIXES = (("san", "francisco"), ("oakland",), ("berkeley",))
+
+
+@dataclass
+class Venue:
+    id: int
+    name: str
+    location: Optional[str]
+    latlong: Optional[str]
+
+
+# Geohash prefix (~150 m) within which a new spelling that shares its
+# first word with an existing venue is taken to be that venue.
+_ALIAS_CELL_PRECISION = 7
+
+# alias key -> venue, for every key resolved by this process. Venues are
+# never deleted, so entries cannot go stale.
+_by_key: dict[str, Venue] = {}
+
+
+def venue_key(name: Optional[str]) -> Optional[str]:
+    """Normalized lookup key for a venue spelling; None if nothing is left."""
+    if not name:
+        return None
+    words = [w for w in fold_text(name.split(",")[0]).split() if w not in _NOISE_WORDS]
+    for suffix in _CITY_SUFFIXES:
+        if len(words) > len(suffix) and tuple(words[-len(suffix) :]) == suffix:
+            words = words[: -len(suffix)]
+    return " ".join(words) or None
+
+
+class _AliasTaken(Exception):
+    """Another ingest registered the key first; roll back and use theirs."""
+
+
+async def _lookup(conn: asyncpg.Connection, key: str) -> Optional[Venue]:
+    row = await conn.fetchrow(
+        """
+        SELECT v.id, v.name, v.location, v.latlong
+        FROM venue_aliases a
+        JOIN venues v ON v.id = a.venue_id
+        WHERE a.alias_key = $1
+        """,
+        key,
+    )
+    return None if row is None else Venue(**row)
+
+
+async def _nearby_venue(
+    conn: asyncpg.Connection, key: str, alias: str, point: tuple[float, float]
+) -> Optional[Venue]:
+    """An existing venue at the same spot whose name starts the same way."""
+    rows = await conn.fetch(
+        """
+        SELECT DISTINCT v.id, v.name, v.location, v.latlong, a.alias_key
+        FROM venues v
+        JOIN venue_aliases a ON a.venue_id = v.id
+        WHERE v.geohash LIKE $1 || '%'
+        """,
+        geohash_encode(*point, precision=_ALIAS_CELL_PRECISION),
+    )
+    first_word = key.split()[0]
+    for row in rows:
+        if row["alias_key"].split()[0] == first_word:
+            await conn.execute(
+                """
+                INSERT INTO venue_aliases (alias_key, venue_id, alias) VALUES ($1, $2, $3)
+                ON CONFLICT (alias_key) DO NOTHING
+                """,
+                key,
+                row["id"],
+                alias,
+            )
+            return Venue(row["id"], row["name"], row["location"], row["latlong"])
+    return None
+
+
+async def _create(
+    conn: asyncpg.Connection,
+    key: str,
+    name: str,
+    location: Optional[str],
+    latlong: Optional[str],
+) -> Venue:
+    point = parse_latlong(latlong)
+    async with conn.transaction():
+        venue_id = await conn.fetchval(
+            """
+            INSERT INTO venues (name, location, latlong, geo, geohash)
+            VALUES ($1, $2, $3, $4, $5)
+            RETURNING id
+            """,
+            name,
+            location,
+            latlong if point else None,
+            point,
+            geohash_encode(*point) if point else None,
+        )
+        added = await conn.fetchval(
+            """
+            INSERT INTO venue_aliases (alias_key, venue_id, alias) VALUES ($1, $2, $3)
+            ON CONFLICT (alias_key) DO NOTHING
+            RETURNING venue_id
+            """,
+            key,
+            venue_id,
+            name,
+        )
+        if added is None:
+            raise _AliasTaken()
+    return Venue(venue_id, name, location, latlong if point else None)
+
+
+async def _fill_missing(
+    conn: asyncpg.Connection, venue: Venue, location: Optional[str], latlong: Optional[str]
+) -> None:
+    """Give a known venue the address or coordinates a later listing carries."""
+    point = parse_latlong(latlong)
+    if (venue.latlong or not point) and (venue.location or not location):
+        return
+    await conn.execute(
+        """
+        UPDATE venues SET
+            location = COALESCE(location, $2),
+            latlong = COALESCE(latlong, $3),
+            geo = CASE WHEN latlong IS NULL THEN $4 ELSE geo END,
+            geohash = CASE WHEN latlong IS NULL THEN $5 ELSE geohash END
+        WHERE id = $1
+        """,
+        venue.id,
+        location,
+        latlong if point else None,
+        point,
+        geohash_encode(*point) if point else None,
+    )
+    venue.location = venue.location or location
+    if point:
+        venue.latlong = venue.latlong or latlong
+
+
+async def resolve(
+    conn: asyncpg.Connection,
+    name: Optional[str],
+    location: Optional[str],
+    latlong: Optional[str],
+    geocode: Callable[[str], Awaitable[Optional[str]]],
+) -> Optional[Venue]:
+    """
+    The venue for a listing, creating it (and geocoding `location` when the
+    listing has no coordinates) the first time its key is seen. A known
+    venue still without coordinates is geocoded from the listing's address.
+    """
+    key = venue_key(name)
+    if key is None:
+        return None
+    venue = _by_key.get(key) or await _lookup(conn, key)
+    if venue is None and parse_latlong(latlong):
+        venue = await _nearby_venue(conn, key, name.strip(), parse_latlong(latlong))
+    if venue is None:
+        if not parse_latlong(latlong) and location:
+            latlong = await geocode(location)
+        try:
+            venue = await _create(conn, key, name.split(",")[0].strip(), location, latlong)
+        except _AliasTaken:
+            venue = await _lookup(conn, key)
+    if venue is not None:
+        # A venue first seen without coordinates is geocoded from the first
+        # later listing that has an address; `_fill_missing` then keeps them.
+        if venue.latlong is None and not parse_latlong(latlong) and location:
+            latlong = await geocode(location)
+        await _fill_missing(conn, venue, location, latlong)
+        _by_key[key] = venue
+    return venue
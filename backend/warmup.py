@@ -0,0 +1,85 @@
+"""
+Post-startup cache warming under a time budget.
+
+`start` runs a list of named async steps in the background after the pools
+are open. `/health` reports 503 until they finish, or until
+`WARMUP_BUDGET_SECONDS` runs out (default 10; 0 disables warming), so a
+load balancer or the weekly workflow's wake-up call only sees the worker
+as ready once the first real request will be served at steady-state speed.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, List, Optional
+
+WARMUP_BUDGET_SECONDS = float(os.getenv("WARMUP_BUDGET_SECONDS", "10"))
+
+Step = tuple[str, Callable[[], Awaitable[Optional[str]]]]
+
+_state = "cold"
+_steps: List[dict] = []
+_elapsed_ms: Optional[float] = None
+_task: Optional[asyncio.Task] = None
+
+
+def is_warm() -> bool:
+    return _state in ("warm", "budget_exceeded", "disabled")
+
+
+def stats() -> dict:
+    return {
+        "state": _state,
+        "budget_seconds": WARMUP_BUDGET_SECONDS,
+        "elapsed_ms": _elapsed_ms,
+        "steps": list(_steps),
+    }
+
+
+async def _run_steps(steps: List[Step]) -> None:
+    for name, step in steps:
+        started = time.perf_counter()
+        entry = {"step": name}
+        try:
+            entry["detail"] = await step()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            entry["error"] = str(e)
+            print(f"⚠️  Warm-up step {name} failed: {e}")
+        entry["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        _steps.append(entry)
+
+
+async def _run(steps: List[Step], budget: float) -> None:
+    global _state, _elapsed_ms
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(_run_steps(steps), timeout=budget)
+        _state = "warm"
+    except asyncio.TimeoutError:
+        _state = "budget_exceeded"
+    _elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    print(f"🔥 Warm-up {_state} in {_elapsed_ms:.0f} ms")
+
+
+def start(steps: List[Step], budget: float = WARMUP_BUDGET_SECONDS) -> None:
+    global _state, _task
+    if budget <= 0:
+        _state = "disabled"
+        return
+    if _task is None:
+        _state = "warming"
+        _task = asyncio.create_task(_run(steps, budget))
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
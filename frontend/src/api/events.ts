@@ -1,4 +1,4 @@
-import type { Event } from '../types/event'
+import type { Event, EventChanges } from '../types/event'
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL ?? '/api'
 const READ_KEY = import.meta.env.VITE_READ_API_KEY ?? ''
@@ -8,8 +8,49 @@ export interface FetchEventsParams {
   startDate?: string
   endDate?: string
   category?: string
+  /** Visible map area as minLon,minLat,maxLon,maxLat */
+  bbox?: [number, number, number, number]
   limit?: number
   sort?: string
+  /** `summary` drops description and the duplicated name/date/category aliases */
+  view?: 'summary' | 'full'
+  /** `columnar` sends parallel arrays with dictionary-encoded venue/source/categories */
+  format?: 'json' | 'columnar'
+}
+
+interface ColumnarEvents {
+  count: number
+  fields: string[]
+  columns: Record<string, unknown[]>
+  dictionaries: Record<string, string[]>
+}
+
+const DICTIONARY_FOR_FIELD: Record<string, string> = {
+  venue: 'venue',
+  source: 'source',
+  sources: 'source',
+  categories: 'categories',
+  category: 'categories',
+}
+
+/** Rebuild row objects from a `format=columnar` response. */
+export function decodeColumnarEvents(body: ColumnarEvents): Event[] {
+  const events: Record<string, unknown>[] = Array.from({ length: body.count }, () => ({}))
+  for (const field of body.fields) {
+    const column = body.columns[field]
+    const dictionary = body.dictionaries[DICTIONARY_FOR_FIELD[field]] ?? []
+    for (let i = 0; i < body.count; i++) {
+      const value = column[i]
+      if (value == null || !(field in DICTIONARY_FOR_FIELD)) {
+        events[i][field] = value
+      } else if (field === 'categories' || field === 'sources') {
+        events[i][field] = (value as number[]).map((code) => dictionary[code])
+      } else {
+        events[i][field] = dictionary[value as number]
+      }
+    }
+  }
+  return events as unknown as Event[]
 }
 
 export async function fetchEvents(params: FetchEventsParams = {}): Promise<Event[]> {
@@ -18,8 +59,11 @@ export async function fetchEvents(params: FetchEventsParams = {}): Promise<Event
   if (params.startDate) search.set('start_date', params.startDate)
   if (params.endDate) search.set('end_date', params.endDate)
   if (params.category) search.set('category', params.category)
+  if (params.bbox) search.set('bbox', params.bbox.join(','))
   search.set('limit', String(params.limit ?? 500))
   search.set('sort', params.sort ?? 'datetime_asc')
+  if (params.view) search.set('view', params.view)
+  if (params.format) search.set('format', params.format)
 
   const headers: HeadersInit = {}
   if (READ_KEY) headers['X-API-Key'] = READ_KEY
@@ -30,5 +74,27 @@ export async function fetchEvents(params: FetchEventsParams = {}): Promise<Event
     const detail = await res.text()
     throw new Error(detail || `Failed to load events (${res.status})`)
   }
+  if (params.format === 'columnar') return decodeColumnarEvents(await res.json())
+  return res.json()
+}
+
+/** Changes since `since`; without it, only the current sync token is returned. */
+export async function fetchEventChanges(
+  since?: string,
+  range: { startDate?: string; endDate?: string } = {},
+): Promise<EventChanges> {
+  const search = new URLSearchParams()
+  if (since) search.set('since', since)
+  if (range.startDate) search.set('start_date', range.startDate)
+  if (range.endDate) search.set('end_date', range.endDate)
+
+  const headers: HeadersInit = {}
+  if (READ_KEY) headers['X-API-Key'] = READ_KEY
+
+  const res = await fetch(`${API_BASE}/events/changes?${search}`, { headers })
+  if (!res.ok) {
+    const detail = await res.text()
+    throw new Error(detail || `Failed to sync events (${res.status})`)
+  }
   return res.json()
 }
@@ -1,5 +1,5 @@
 import { useCallback, useEffect, useMemo, useState } from 'react'
-import { fetchEvents } from '../api/events'
+import { fetchEventChanges, fetchEvents } from '../api/events'
 import type { Event, EventCategory, EventFilters } from '../types/event'
 import {
   addDaysToIsoDate,
@@ -9,7 +9,7 @@ import {
   minIsoDate,
   toIsoDate,
 } from '../utils/dates'
-import { eventIsoDate, mergeEventsById } from '../utils/eventCache'
+import { applyEventChanges, eventIsoDate, mergeEventsById } from '../utils/eventCache'
 import {
   clearEventsCache,
   readEventsCache,
@@ -19,6 +19,9 @@ import {
 /** Default preload window: today through today + this many calendar months */
 const CACHE_WINDOW_MONTHS = 1
 const FETCH_LIMIT = 1000
+/** Cards and the map only read summary fields */
+const FETCH_VIEW = 'summary'
+const FETCH_FORMAT = 'columnar'
 
 function defaultWindow(): { start: string; end: string } {
   const start = toIsoDate(new Date())
@@ -33,16 +36,24 @@ function loadInitialState(): {
   cachedEvents: Event[]
   loadedStart: string | null
   loadedEnd: string | null
+  syncToken: string | null
   fetching: boolean
 } {
   const stored = readEventsCache()
   if (!stored || stored.events.length === 0) {
-    return { cachedEvents: [], loadedStart: null, loadedEnd: null, fetching: true }
+    return {
+      cachedEvents: [],
+      loadedStart: null,
+      loadedEnd: null,
+      syncToken: null,
+      fetching: true,
+    }
   }
   return {
     cachedEvents: stored.events,
     loadedStart: stored.loadedStart,
     loadedEnd: stored.loadedEnd,
+    syncToken: stored.syncToken ?? null,
     fetching: false,
   }
 }
@@ -62,6 +73,7 @@ export function useEvents(filters: EventFilters) {
   const [cachedEvents, setCachedEvents] = useState<Event[]>(() => loadInitialState().cachedEvents)
   const [loadedStart, setLoadedStart] = useState<string | null>(() => loadInitialState().loadedStart)
   const [loadedEnd, setLoadedEnd] = useState<string | null>(() => loadInitialState().loadedEnd)
+  const [syncToken, setSyncToken] = useState<string | null>(() => loadInitialState().syncToken)
   const [fetching, setFetching] = useState(() => loadInitialState().fetching)
   const [error, setError] = useState<string | null>(null)
 
@@ -72,9 +84,43 @@ export function useEvents(filters: EventFilters) {
         loadedStart,
         loadedEnd,
         savedAt: new Date().toISOString(),
+        syncToken: syncToken ?? undefined,
       })
     }
-  }, [cachedEvents, loadedStart, loadedEnd])
+  }, [cachedEvents, loadedStart, loadedEnd, syncToken])
+
+  // On load, bring a stored window up to date with only what changed since it was saved.
+  useEffect(() => {
+    const initial = loadInitialState()
+    if (!initial.syncToken || !initial.loadedStart || !initial.loadedEnd) return
+    let cancelled = false
+
+    async function sync(token: string, start: string, end: string) {
+      for (;;) {
+        const changes = await fetchEventChanges(token, { startDate: start, endDate: end })
+        if (cancelled) return
+        if (changes.reset) {
+          clearEventsCache()
+          setCachedEvents([])
+          setLoadedStart(null)
+          setLoadedEnd(null)
+          setSyncToken(null)
+          return
+        }
+        setCachedEvents((prev) => applyEventChanges(prev, changes.upserted, changes.deleted))
+        token = changes.token
+        if (!changes.has_more) break
+      }
+      setSyncToken(token)
+    }
+
+    sync(initial.syncToken, initial.loadedStart, initial.loadedEnd).catch(() => {
+      /* keep serving the stored window; the next load retries */
+    })
+    return () => {
+      cancelled = true
+    }
+  }, [])
 
   useEffect(() => {
     let cancelled = false
@@ -100,16 +146,20 @@ export function useEvents(filters: EventFilters) {
       try {
         if (loadedStart === null || loadedEnd === null) {
           const { start, end } = defaultWindow()
+          const { token } = await fetchEventChanges()
           const data = await fetchEvents({
             startDate: start,
             endDate: end,
             limit: FETCH_LIMIT,
+            view: FETCH_VIEW,
+            format: FETCH_FORMAT,
             sort: 'datetime_asc',
           })
           if (cancelled) return
           setCachedEvents(data)
           setLoadedStart(start)
           setLoadedEnd(end)
+          setSyncToken(token)
           return
         }
 
@@ -120,6 +170,8 @@ export function useEvents(filters: EventFilters) {
             startDate: from,
             endDate: to,
             limit: FETCH_LIMIT,
+            view: FETCH_VIEW,
+            format: FETCH_FORMAT,
             sort: 'datetime_asc',
           })
           if (cancelled) return
@@ -139,6 +191,8 @@ export function useEvents(filters: EventFilters) {
             startDate: from,
             endDate: to,
             limit: FETCH_LIMIT,
+            view: FETCH_VIEW,
+            format: FETCH_FORMAT,
             sort: 'datetime_asc',
           })
           if (cancelled) return
@@ -154,6 +208,8 @@ export function useEvents(filters: EventFilters) {
             startDate: from,
             endDate: to,
             limit: FETCH_LIMIT,
+            view: FETCH_VIEW,
+            format: FETCH_FORMAT,
             sort: 'datetime_asc',
           })
           if (cancelled) return
@@ -194,6 +250,7 @@ export function useEvents(filters: EventFilters) {
     setCachedEvents([])
     setLoadedStart(null)
     setLoadedEnd(null)
+    setSyncToken(null)
     setFetching(true)
     setError(null)
   }, [])
@@ -5,6 +5,7 @@ export interface Event {
   datetime?: string
   date?: string
   venue?: string
+  venue_id?: number
   location?: string
   latlong?: string
   url?: string
@@ -12,6 +13,17 @@ export interface Event {
   categories?: string[]
   category?: string
   source?: string
+  /** Every source that listed this event, first listing first */
+  sources?: string[]
+}
+
+/** Response of GET /events/changes */
+export interface EventChanges {
+  token: string
+  upserted: Event[]
+  deleted: number[]
+  has_more: boolean
+  reset: boolean
 }
 
 export type EventCategory =
@@ -21,3 +21,12 @@ export function mergeEventsById(a: Event[], b: Event[]): Event[] {
     return ax.localeCompare(ay)
   })
 }
+
+/** Apply a delta from /events/changes to the cached events */
+export function applyEventChanges(events: Event[], upserted: Event[], deleted: number[]): Event[] {
+  const removed = new Set(deleted)
+  return mergeEventsById(
+    events.filter((e) => !removed.has(e.id)),
+    upserted.filter((e) => !removed.has(e.id)),
+  )
+}
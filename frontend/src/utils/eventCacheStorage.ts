@@ -7,6 +7,8 @@ export interface StoredEventsCache {
   loadedStart: string
   loadedEnd: string
   savedAt: string
+  /** Token for GET /events/changes, taken before the window was fetched */
+  syncToken?: string
 }
 
 function isIsoDate(s: string): boolean {